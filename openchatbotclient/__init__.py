@@ -1,9 +1,38 @@
-"""Client for Open Chat Bot's"""
+"""Client for Open Chat Bot's
 
-from .client import Client
-from .descriptor import Descriptor
-from .repository import Repository
-from .response import Response
-#from .response_group import ResponseGroup
+The classes are imported from their modules when first used, so that
+importing the package stays fast.
+"""
 
-from .client_group import ClientGroup
+import importlib
+
+# The module of each class exported by the package
+_EXPORTS = {
+    'Client': 'client',
+    'Descriptor': 'descriptor',
+    'DescriptorCache': 'descriptor_cache',
+    'Repository': 'repository',
+    'Response': 'response',
+    #'ResponseGroup': 'response_group',
+    'Transport': 'transport',
+    'AsyncTransport': 'transport',
+    'Http2Transport': 'transport',
+    'ClientGroup': 'client_group',
+    'AsyncClient': 'async_client',
+    'AsyncClientGroup': 'async_client_group',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
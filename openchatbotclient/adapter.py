@@ -0,0 +1,92 @@
+"""The requests adapter of the Transport.
+
+The connections opened by the transport record the time spent in the TCP
+connection and in the TLS handshake, in transport.timings.
+
+This module imports requests and urllib3, which are long to import: it is
+only imported by the first request of a transport.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version, moved from the transport module
+"""
+
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from .transport import timings
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            timings.connect += time.perf_counter() - start
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            timings.connect += time.perf_counter() - start
+
+    def connect(self):
+        start = time.perf_counter()
+        connect = timings.connect
+        try:
+            return super().connect()
+        finally:
+            # What is not the TCP connection is the TLS handshake
+            timings.tls += time.perf_counter() - start - (timings.connect - connect)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """An adapter whose connections record their timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def create_session(pool_connections: int, pool_maxsize: int, pool_block: bool, retries,
+                   backoff_factor: float, verify: bool) -> requests.Session:
+    """returns a requests session with pooled and timed connections. The
+       parameters are the ones of the Transport
+    """
+    if not isinstance(retries, Retry):
+        retries = Retry(total=retries, connect=retries, read=0, status=0,
+                        backoff_factor=backoff_factor)
+
+    adapter = TimedHTTPAdapter(pool_connections=pool_connections,
+                               pool_maxsize=pool_maxsize,
+                               pool_block=pool_block,
+                               max_retries=retries)
+
+    session = requests.Session()
+    session.verify = verify
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
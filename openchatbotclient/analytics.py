@@ -0,0 +1,393 @@
+"""Columnar analytics of the response groups.
+
+The responses of many group queries, such as the ones of an A/B comparison
+of bots, are flattened into a ResponseTable: one row per bot and per group
+query, stored by column. Its aggregates (win rate, success rate, latency
+percentiles by bot) are computed with numpy over the whole columns, without
+looping over the Response objects:
+
+    from openchatbotclient.analytics import ResponseTable
+
+    table = ResponseTable()
+    for responses in groups:
+        table.append(responses)
+
+    print(table.get_win_rates())
+    print(table.get_latency_percentiles((50, 99)))
+    frame = table.to_pandas()
+
+The columns are:
+    - group: the index of the group query
+    - client: the bot, as an index in the categories of the column
+    - status: the status string of the response, as an index in its categories
+    - error: the name of the exception of an ErrorRecord, as an index in its
+             categories. Index 0 is the empty name of the responses
+    - success: whether the bot answered with the 'success' status
+    - code: the status code of the response, or of the ChatbotServerError
+    - rank: the position of the response in its group, -1 for the errors
+    - latency: the time in seconds taken by the bot, NaN if unknown
+    - score: the confidence score of the response
+    - text_length: the length of the text of the response
+    - suggested_actions: the number of suggested actions of the response
+
+The rows are accumulated in compact arrays, so that a table may be built
+without numpy. numpy is required by the exports and the aggregates, and
+pandas or pyarrow by the matching exports.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
+
+from array import array
+
+from .exception import ChatbotServerError
+from .response import ErrorRecord
+
+PERCENTILES_DEFAULT = (50, 90, 99)
+
+# The winner of a group query: its first response, or its best score
+WIN_BY_RANK = 'rank'
+WIN_BY_SCORE = 'score'
+
+# The columns holding an index in a list of categories
+CATEGORIES = ('client', 'status', 'error')
+
+# The numerical columns, with their array typecode and numpy type
+NUMERICAL = (
+    ('group', 'q', 'i8'),
+    ('success', 'b', '?'),
+    ('code', 'i', 'i4'),
+    ('rank', 'i', 'i4'),
+    ('latency', 'd', 'f8'),
+    ('score', 'd', 'f8'),
+    ('text_length', 'i', 'i4'),
+    ('suggested_actions', 'i', 'i4'),
+)
+
+COLUMNS = ('group',) + CATEGORIES + tuple(name for name, _, _ in NUMERICAL[1:])
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The analytics of a ResponseTable require the numpy package: pip install numpy")
+    return numpy
+
+
+def get_client_name(client) -> str:
+    """returns the name of a client in the table: its base URL if any"""
+    return getattr(client, 'base_url', None) or str(client)
+
+
+def count_suggested_actions(response) -> int:
+    """returns the number of suggested actions in the medias of a response"""
+    return sum(len(media.get('suggested_actions') or ()) for media in response.medias)
+
+
+class ResponseTable:
+
+    def __init__(self, actions: bool = True):
+        """Create an empty table. The constructor parameters are:
+           - actions: whether the suggested actions are counted. They are
+                      decoded from the raw content of each response, which
+                      is the most expensive part of appending a group
+        """
+        self.actions = actions
+        self.groups = 0
+
+        self._numerical = {name: array(typecode) for name, typecode, _ in NUMERICAL}
+        self._codes = {name: array('i') for name in CATEGORIES}
+        # The values of each categorical column, and their index
+        self._categories = {name: [] for name in CATEGORIES}
+        self._indexes = {name: {} for name in CATEGORIES}
+        self._get_code('error', '')
+
+    def __len__(self):
+        return len(self._numerical['group'])
+
+    def __str__(self):
+        return 'response_table(%d rows, %d groups, %d clients)' % (
+            len(self), self.groups, len(self._categories['client']))
+
+    @classmethod
+    def from_groups(cls, groups, actions: bool = True):
+        """Create a table with the rows of response groups, such as a list
+           or a stream of them
+        """
+        table = cls(actions=actions)
+        table.extend(groups)
+        return table
+
+    def _get_code(self, column: str, value) -> int:
+        indexes = self._indexes[column]
+        code = indexes.get(value)
+        if code is None:
+            code = indexes[value] = len(indexes)
+            self._categories[column].append(value)
+        return code
+
+    def _add_row(self, client, status, error, success, code, rank, latency, score, text_length, actions):
+        numerical = self._numerical
+        codes = self._codes
+        numerical['group'].append(self.groups)
+        codes['client'].append(self._get_code('client', get_client_name(client)))
+        codes['status'].append(self._get_code('status', status))
+        codes['error'].append(self._get_code('error', error))
+        numerical['success'].append(success)
+        numerical['code'].append(code)
+        numerical['rank'].append(rank)
+        numerical['latency'].append(latency if latency is not None else float('nan'))
+        numerical['score'].append(score)
+        numerical['text_length'].append(text_length)
+        numerical['suggested_actions'].append(actions)
+
+    def append(self, responses):
+        """Add the rows of a ResponseGroup: one per response and per error record"""
+        for rank, response in enumerate(responses):
+            self._add_row(response.client, response.status, '', response.is_success,
+                          response.code or 0, rank, response.latency, response.score or 0,
+                          len(response.text or ''),
+                          count_suggested_actions(response) if self.actions else 0)
+        for record in getattr(responses, 'errors', ()):
+            error = record.error
+            code = error.status if isinstance(error, ChatbotServerError) and isinstance(error.status, int) else 0
+            self._add_row(record.client, '', type(error).__name__, False, code, -1, record.latency, 0, 0, 0)
+        self.groups += 1
+
+    def extend(self, groups):
+        for responses in groups:
+            self.append(responses)
+
+    def get_categories(self, column: str) -> list:
+        """returns the values of a categorical column, by index"""
+        return list(self._categories[column])
+
+    #
+    # Exports
+    #
+    def _get_columns(self) -> dict:
+        """returns the columns as numpy arrays sharing the memory of the table.
+           No row may be added while they are referenced
+        """
+        numpy = _import_numpy()
+        columns = {}
+        for name, _, dtype in NUMERICAL:
+            columns[name] = numpy.frombuffer(self._numerical[name], dtype=dtype)
+        for name in CATEGORIES:
+            columns[name] = numpy.frombuffer(self._codes[name], dtype='i4')
+        return {name: columns[name] for name in COLUMNS}
+
+    def to_columns(self) -> dict:
+        """returns a copy of the columns, as a dict of numpy arrays. The
+           categorical columns hold indexes, see get_categories
+        """
+        return {name: column.copy() for name, column in self._get_columns().items()}
+
+    def to_numpy(self):
+        """returns the rows as a numpy structured array. The categorical
+           columns hold indexes, see get_categories
+        """
+        numpy = _import_numpy()
+        columns = self._get_columns()
+        rows = numpy.empty(len(self), dtype=[(name, column.dtype) for name, column in columns.items()])
+        for name, column in columns.items():
+            rows[name] = column
+        return rows
+
+    def to_pandas(self):
+        """returns the rows as a pandas DataFrame, with categorical columns"""
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("The export of a ResponseTable to pandas requires the pandas package: pip install pandas")
+        columns = self.to_columns()
+        for name in CATEGORIES:
+            columns[name] = pandas.Categorical.from_codes(columns[name], categories=self._categories[name])
+        return pandas.DataFrame(columns)
+
+    def to_arrow(self):
+        """returns the rows as a pyarrow Table, with dictionary encoded columns"""
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("The export of a ResponseTable to Arrow requires the pyarrow package: pip install pyarrow")
+        columns = self.to_columns()
+        for name in CATEGORIES:
+            columns[name] = pyarrow.DictionaryArray.from_arrays(columns[name], self._categories[name])
+        return pyarrow.table(columns)
+
+    #
+    # Aggregates by client
+    #
+    def _count_by_client(self, numpy, mask=None):
+        clients = self._get_columns()['client']
+        if mask is not None:
+            clients = clients[mask]
+        return numpy.bincount(clients, minlength=len(self._categories['client']))
+
+    def _by_client(self, values) -> dict:
+        return dict(zip(self._categories['client'], values))
+
+    def get_counts(self) -> dict:
+        """returns the number of group queries sent to each client"""
+        numpy = _import_numpy()
+        return self._by_client(self._count_by_client(numpy).tolist())
+
+    def get_success_rates(self) -> dict:
+        """returns the fraction of the queries each client answered with success"""
+        numpy = _import_numpy()
+        columns = self._get_columns()
+        queried = self._count_by_client(numpy)
+        successes = self._count_by_client(numpy, columns['success'])
+        return self._by_client((successes / numpy.maximum(queried, 1)).tolist())
+
+    def get_winners(self, by: str = WIN_BY_RANK):
+        """returns the index of the winning row of each group query that got a
+           successful response. The winner is either the first successful
+           response of the group (by rank), or the one with the best score,
+           the first one winning the ties
+        """
+        numpy = _import_numpy()
+        columns = self._get_columns()
+        candidates = columns['success'].copy()
+        if by == WIN_BY_SCORE:
+            # The rows are sorted by group: the best score of each group is
+            # reduced over the slices starting at each new group
+            groups = columns['group']
+            starts = numpy.flatnonzero(numpy.diff(groups, prepend=-1))
+            scores = numpy.where(candidates, columns['score'], -numpy.inf)
+            best = numpy.maximum.reduceat(scores, starts) if len(starts) else scores
+            candidates &= scores == numpy.repeat(best, numpy.diff(starts, append=len(groups)))
+        elif by != WIN_BY_RANK:
+            raise ValueError("Unknown winner '%s'" % by)
+
+        # The responses of a group are in the order of their rank: the
+        # winner is the first candidate row of its group
+        rows = numpy.flatnonzero(candidates)
+        groups = columns['group'][rows]
+        first = numpy.ones(len(rows), dtype=bool)
+        first[1:] = groups[1:] != groups[:-1]
+        return rows[first]
+
+    def get_win_rates(self, by: str = WIN_BY_RANK) -> dict:
+        """returns the fraction of the group queries sent to each client that
+           it won, see get_winners
+        """
+        numpy = _import_numpy()
+        winners = self._get_columns()['client'][self.get_winners(by)]
+        wins = numpy.bincount(winners, minlength=len(self._categories['client']))
+        queried = self._count_by_client(numpy)
+        return self._by_client((wins / numpy.maximum(queried, 1)).tolist())
+
+    def get_latency_percentiles(self, percentiles=PERCENTILES_DEFAULT, successes: bool = True) -> dict:
+        """returns a dict associating each client to the percentiles of its
+           latency in seconds, as a dict, or None if it has no latency. By
+           default only the latency of the successful responses is used
+        """
+        numpy = _import_numpy()
+        columns = self._get_columns()
+        mask = ~numpy.isnan(columns['latency'])
+        if successes:
+            mask &= columns['success']
+        clients = columns['client'][mask]
+        latencies = columns['latency'][mask]
+
+        # The latencies sorted by client, and the bounds of each client
+        order = numpy.argsort(clients, kind='stable')
+        latencies = latencies[order]
+        counts = numpy.bincount(clients, minlength=len(self._categories['client']))
+        ends = numpy.cumsum(counts)
+
+        results = {}
+        for name, count, end in zip(self._categories['client'], counts.tolist(), ends.tolist()):
+            if not count:
+                results[name] = None
+                continue
+            values = numpy.percentile(latencies[end - count:end], percentiles)
+            results[name] = dict(zip(percentiles, values.tolist()))
+        return results
+
+    #
+    # Storage
+    #
+    def save(self, path: str):
+        """Write the table to a numpy .npz file"""
+        numpy = _import_numpy()
+        columns = self._get_columns()
+        for name in CATEGORIES:
+            columns['%s_categories' % name] = numpy.array(self._categories[name], dtype=str)
+        numpy.savez_compressed(path, groups=self.groups, actions=self.actions, **columns)
+
+    @classmethod
+    def load(cls, path: str):
+        """returns a table read from a file written by save"""
+        numpy = _import_numpy()
+        with numpy.load(path) as data:
+            table = cls(actions=bool(data['actions']))
+            table.groups = int(data['groups'])
+            for name, typecode, dtype in NUMERICAL:
+                table._numerical[name] = array(typecode, data[name].astype(dtype).tobytes())
+            for name in CATEGORIES:
+                table._codes[name] = array('i', data[name].astype('i4').tobytes())
+                table._categories[name] = data['%s_categories' % name].tolist()
+                table._indexes[name] = {value: index for index, value in enumerate(table._categories[name])}
+        return table
+
+
+#
+# Sample code, comparing a Python loop over the responses with the
+# vectorized aggregates, over synthetic response groups.
+#
+if __name__ == '__main__':
+    import random
+    import time
+
+    import numpy
+
+    from openchatbotclient.response import Response
+    from openchatbotclient.response_group import ResponseGroup
+
+    class Bot:
+        def __init__(self, name):
+            self.base_url = name
+
+    random.seed(1)
+    bots = [Bot('https://bot%d.domain.com/api/ask' % i) for i in range(4)]
+    count = 100000
+
+    groups = []
+    for i in range(count):
+        responses = ResponseGroup()
+        for bot in random.sample(bots, len(bots)):
+            if random.random() < 0.05:
+                responses.add_error(ErrorRecord(bot, ChatbotServerError(500, 'error'), random.random()))
+                continue
+            data = {'response': {'text': 'hello' * random.randint(1, 10), 'score': random.random(),
+                                 'medias': [{'suggested_actions': [{}] * random.randint(0, 3)}]},
+                    'status': {'code': 200, 'status': 'success'}}
+            responses.append(Response(bot, data, latency=random.expovariate(20)))
+        groups.append(responses)
+
+    start = time.perf_counter()
+    table = ResponseTable.from_groups(groups)
+    print("%s built in %.2fs" % (table, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    wins = {}
+    for responses in groups:
+        best = max(responses, key=lambda response: response.score, default=None)
+        if best is not None:
+            wins[best.client.base_url] = wins.get(best.client.base_url, 0) + 1
+    print("Python loop:  %.1fms" % ((time.perf_counter() - start) * 1000))
+
+    start = time.perf_counter()
+    rates = table.get_win_rates(by=WIN_BY_SCORE)
+    print("Vectorized:   %.1fms" % ((time.perf_counter() - start) * 1000))
+
+    for name, rate in rates.items():
+        print("%-36s wins %5.1f%% (%d)" % (name, rate * 100, wins.get(name, 0)))
+    print(table.get_latency_percentiles())
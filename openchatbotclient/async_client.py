@@ -0,0 +1,265 @@
+"""Asynchronous client for Open Chat Bot.
+
+The AsyncClient has the same interface as the Client, except that its ask
+method is a coroutine, that does not block the event loop:
+
+    from openchatbotclient import AsyncClient
+
+    async def main():
+        client = AsyncClient('https://bot.domain.com', 8443, path='api')
+        response = await client.ask("my-userId", "hello")
+
+All the async clients of an event loop share the same pool of connections,
+unless they are given their own AsyncTransport. The AsyncClient requires
+the optional httpx package.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial class implementation
+    - 2026/10/18: Adding the "ask_many" method
+    - 2026/10/18: Adding the hooks, see the metrics module
+    - 2026/10/18: Adding the response cache
+    - 2026/10/18: Adding the single-flight mode
+    - 2026/10/18: Adding the health of the bot, and its circuit breaker
+    - 2026/10/18: Adding the hedging policy
+    - 2026/10/18: Adding the "ask_stream" method
+    - 2026/10/18: Adding the rate and concurrency limiter
+    - 2026/10/18: Adding the "session" method, see the conversation module
+"""
+
+import asyncio
+import itertools
+import time
+
+from collections import deque
+
+from . import codec
+
+from .client import Client, CONCURRENCY_DEFAULT
+from .exception import CircuitOpenError, RateLimitError
+from .limiter import get_wait_timeout
+from .metrics import CallRecord
+from .response import ErrorRecord
+from .stream import ACCEPT, AsyncStreamingResponse
+from .transport import AsyncTransport, Timings
+
+class AsyncClient(Client):
+
+    def __init__(self, host: str, port: int = 0, path: str = None, descriptor=None,
+                 transport: AsyncTransport = None, hooks=None, cache=None,
+                 single_flight=None, health=None, hedging=None, limiter=None):
+        """Create a client that may be queried. The constructor parameters are
+           the same as for Client, except for:
+           - transport: optional, an AsyncTransport instance. By default the
+                        transport shared by the running event loop is used.
+        """
+        super().__init__(host, port=port, path=path, descriptor=descriptor, transport=transport, hooks=hooks,
+                         cache=cache, single_flight=single_flight, health=health,
+                         hedging=hedging, limiter=limiter)
+
+        # Neither the shared transport, nor the one given by the caller
+        # is closed with the client.
+        self._owns_transport = False
+
+    def __str__(self):
+        return "async_client('%s')" % self.hostname
+
+    def _create_transport(self):
+        # The shared transport depends on the event loop, which is
+        # only known when the client is queried.
+        return None
+
+    def get_transport(self) -> AsyncTransport:
+        """Returns the AsyncTransport used to send the queries"""
+        return self.transport or AsyncTransport.shared()
+
+    async def ask(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get', timeout=None):
+        """Invoke request to bot and receive answer. The parameters
+           are the same as for Client.ask
+        """
+        params = self._get_params(userId, query, lang, location)
+
+        cache_key = self.cache.get_key(self, params, method) if self.cache is not None else None
+        if cache_key is not None:
+            response = self.cache.get(cache_key)
+            if response is not None:
+                return response.copy(self, user_id=userId, latency=0)
+
+        if self.single_flight is not None:
+            flight_key = self.single_flight.get_key(self, params)
+            response, shared = await self.single_flight.do_async(flight_key, self._ask, params, method, timeout,
+                                                                 timeout=timeout)
+            if shared:
+                response = response.copy(self, user_id=userId)
+        else:
+            response = await self._ask(params, method, timeout)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, response)
+        return response
+
+    async def _ask(self, params: dict, method: str, timeout=None):
+        """Send the query to the bot, notifying the hooks and tracking the health
+           of the bot, and returns its Response
+        """
+        health = self.health
+        if health is not None and not health.allow_request():
+            raise CircuitOpenError(self.base_url, health.retry_after)
+
+        # Each query sent, including the hedged ones, waits for the limiter
+        send = self._send if self.limiter is None else self._send_limited
+
+        record = CallRecord(self, method) if self.hooks else None
+        start = time.perf_counter()
+        try:
+            if self.hedging is not None:
+                response = await self.hedging.call_async(method, send, params, method, timeout,
+                                                         record=record, url=self.base_url)
+            else:
+                response = await send(params, method, timeout, record)
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                raise
+            if isinstance(e, RateLimitError):
+                # The query was not sent: the bot is not to blame, and the
+                # hooks are not notified
+                if health is not None:
+                    health.cancel_request()
+                record = None
+                raise
+            if health is not None:
+                health.record_failure()
+            if record is not None:
+                self._record_error(record, e)
+            raise
+        else:
+            latency = time.perf_counter() - start
+            if health is not None:
+                health.record_success(latency)
+        finally:
+            if record is not None:
+                record.total = time.perf_counter() - start
+                self._notify(record)
+        return response
+
+    async def _send_limited(self, params: dict, method: str, timeout=None, record: CallRecord = None):
+        """The asyncio version of Client._send_limited"""
+        limit = self.limiter.get(self.base_url)
+        sent = await limit.acquire_async(get_wait_timeout(timeout))
+        try:
+            response = await self._send(params, method, timeout, record)
+        except BaseException as e:
+            limit.release(sent, error=e)
+            raise
+        limit.release(sent, time.perf_counter() - sent)
+        return response
+
+    async def _send(self, params: dict, method: str, timeout=None, record: CallRecord = None):
+        """Send the query to the bot, and returns its Response. The details of
+           the query are kept in the record, if any
+        """
+        transport = self.get_transport()
+        timings = Timings() if record is not None else None
+
+        start = time.perf_counter()
+        data = None
+        if method == 'get':
+            r = await transport.get(self.base_url, params=params, timeout=timeout, timings=timings)
+        elif method == 'post':
+            data = codec.dumps(params)
+            r = await transport.post(self.base_url, data=data, headers=self._headers, timeout=timeout,
+                                     timings=timings)
+        else:
+            raise RuntimeError("Unknown method '%s'"%(method))
+        latency = time.perf_counter() - start
+
+        if record is not None:
+            self._record_response(record, r, data, timings)
+
+        response = self._get_response(r, latency)
+
+        if record is not None:
+            record.code = response.code
+        return response
+
+    def session(self, userId: str, lang: str = None, location: str = None, method: str = 'get', timeout=None,
+                send_context: bool = False, transport=None):
+        """Returns an AsyncConversation of the user with the bot, see Client.session"""
+        from .conversation import AsyncConversation
+        return AsyncConversation(self, userId, lang=lang, location=location, method=method, timeout=timeout,
+                                 send_context=send_context, transport=transport)
+
+    async def ask_stream(self, userId: str, query: str, lang: str = None, location: str = None,
+                         method: str = 'get', timeout=None):
+        """Invoke request to bot, and returns an AsyncStreamingResponse as soon as
+           the headers of its answer are received:
+
+               async with await client.ask_stream("my-userId", "hello") as stream:
+                   print(await stream.get_text())
+        """
+        params = self._get_params(userId, query, lang, location)
+        headers = {'Accept': ACCEPT}
+        transport = self.get_transport()
+
+        start = time.perf_counter()
+        if method == 'get':
+            r = await transport.stream('GET', self.base_url, params=params, headers=headers, timeout=timeout)
+        elif method == 'post':
+            r = await transport.stream('POST', self.base_url, data=codec.dumps(params),
+                                       headers=dict(self._headers, **headers), timeout=timeout)
+        else:
+            raise RuntimeError("Unknown method '%s'"%(method))
+        return AsyncStreamingResponse(self, r, start)
+
+    async def ask_many(self, queries, concurrency: int = CONCURRENCY_DEFAULT, ordered: bool = True,
+                       lang: str = None, location: str = None, method: str = 'get', timeout=None):
+        """Invoke many requests to the bot, concurrently. The parameters
+           are the same as for Client.ask_many. This is an asynchronous
+           generator of Response, or of ErrorRecord for the failed queries:
+
+               async for response in client.ask_many(queries):
+                   print(response.text)
+        """
+        defaults = dict(lang=lang, location=location, method=method, timeout=timeout)
+
+        async def ask(item):
+            kwargs = self._get_query_kwargs(item, defaults)
+            start = time.perf_counter()
+            try:
+                return await self.ask(**kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return ErrorRecord(self, e, time.perf_counter() - start,
+                                   user_id=kwargs.get('userId'), query=kwargs.get('query'))
+
+        iterator = iter(queries)
+
+        if ordered:
+            pending = deque(asyncio.ensure_future(ask(item)) for item in itertools.islice(iterator, concurrency))
+        else:
+            pending = set(asyncio.ensure_future(ask(item)) for item in itertools.islice(iterator, concurrency))
+
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                    await done[0]
+                else:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for item in itertools.islice(iterator, len(done)):
+                    task = asyncio.ensure_future(ask(item))
+                    if ordered:
+                        pending.append(task)
+                    else:
+                        pending.add(task)
+
+                for task in done:
+                    yield task.result()
+        finally:
+            # The caller stopped early: the queries in flight are no longer needed
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,179 @@
+"""Asynchronous client group for Open Chat Bot.
+
+The AsyncClientGroup is a list of AsyncClient, queried concurrently from
+the event loop:
+
+    bots = AsyncClientGroup()
+    bots.append(AsyncClient('https://callbot.konverso.ai', 443))
+    bots.append(AsyncClient('https://doungdoung.com', 443, path='/api/doungdoung/v1.0/ask'))
+
+    responses = await bots.ask("amedee", "hello", lang="en", deadline=2.0)
+
+The queries still running when the deadline expires, when the strategy of
+the group is complete, or when the group query itself is cancelled, are
+cancelled. As for ClientGroup, the bots whose circuit is open are not
+waited for (see the health module).
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial class implementation
+    - 2026/10/18: Adding the strategies
+    - 2026/10/18: Adding the hooks, see the metrics module
+    - 2026/10/18: Adding a default timeout
+    - 2026/10/18: Adding the ranker, see the ranking module
+    - 2026/10/18: The health of the clients is enabled by the group
+"""
+
+import asyncio
+import time
+
+from .async_client import AsyncClient
+from .client_group import TIMEOUT_DEFAULT
+from .exception import DeadlineExceededError
+from .metrics import GroupCallRecord
+from .response import ErrorRecord
+from .response_group import ResponseGroup
+
+class AsyncClientGroup(list):
+
+    def __init__(self, *args):
+        super().__init__(*args)
+
+        # Hooks notified of each group query, and of the queries of the clients
+        self.hooks = []
+
+        for client in self:
+            client.track_health()
+
+    def append(self, client):
+        assert isinstance(client, AsyncClient)
+        super().append(client)
+        client.track_health()
+        for hook in self.hooks:
+            client.add_hook(hook)
+
+    def add_hook(self, hook):
+        """Add a Hook instance, notified of each group query, and installed
+           on all the clients of the group to be notified of their queries
+        """
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+        for client in self:
+            client.add_hook(hook)
+
+    async def ask(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+                  timeout=None, deadline: float = None, strategy=None, ranker=None):
+        """Invoke request to each of the bots in the group concurrently
+           and returns an aggregated answer.
+
+           Optional parameters:
+            - timeout: the timeout in seconds of each bot query. Defaults to
+                       TIMEOUT_DEFAULT, unless a deadline is given
+            - deadline: the maximum time in seconds for the whole group. Bots that
+                        did not answer by then are cancelled and reported as errors
+            - strategy: a Strategy instance (see the strategy module) deciding when
+                        the group has enough answers. The queries no longer needed
+                        are cancelled
+            - ranker: a Ranker instance (see the ranking module) given each response
+                      as soon as it is received, with the index of its bot in the group
+
+           Returns an instance of response_group, as ClientGroup.ask
+        """
+        if deadline is None and strategy is not None:
+            deadline = strategy.deadline
+
+        if timeout is None and deadline is None:
+            timeout = TIMEOUT_DEFAULT
+
+        kwargs = dict(userId=userId, query=query, lang=lang, location=location, method=method, timeout=timeout)
+
+        start = time.perf_counter()
+
+        if strategy is None:
+            results = await self._gather(kwargs, deadline, start, ranker)
+            responses = [result for result in results if not isinstance(result, ErrorRecord)]
+        else:
+            results = await self._wait(kwargs, deadline, start, strategy, ranker)
+            responses = strategy.select(self, results)
+
+        json_result_list = ResponseGroup()
+        for response in responses:
+            json_result_list.append(response)
+        for result in results:
+            if isinstance(result, ErrorRecord):
+                json_result_list.add_error(result)
+
+        if self.hooks:
+            record = GroupCallRecord(self, time.perf_counter() - start,
+                                     len(json_result_list), len(json_result_list.errors))
+            for hook in self.hooks:
+                hook.on_group_call(record)
+
+        return json_result_list
+
+    async def _gather(self, kwargs, deadline, start, ranker=None):
+        """Query all the bots, and returns their results in the order of the group"""
+        tasks = [asyncio.ensure_future(_ask_client(client, kwargs, ranker, index))
+                 for index, client in enumerate(self)]
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), deadline)
+        except asyncio.TimeoutError:
+            # The gather was cancelled, and with it all the pending queries
+            pass
+
+        results = []
+        for client, task in zip(self, tasks):
+            if task.cancelled():
+                results.append(ErrorRecord(client, DeadlineExceededError(deadline), time.perf_counter() - start))
+            else:
+                results.append(task.result())
+        return results
+
+    async def _wait(self, kwargs, deadline, start, strategy, ranker=None):
+        """Query all the bots until the strategy is complete, and returns their
+           results in the order they were received
+        """
+        tasks = {asyncio.ensure_future(_ask_client(client, kwargs, ranker, index)): client
+                 for index, client in enumerate(self)}
+        pending = set(tasks)
+        end = start + deadline if deadline is not None else None
+
+        results = []
+        complete = False
+        try:
+            while pending and not complete:
+                remaining = end - time.perf_counter() if end is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                results.extend(task.result() for task in done)
+                complete = strategy.is_complete(self, results)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if not complete:
+            # The bots still pending are late
+            for task in pending:
+                results.append(ErrorRecord(tasks[task], DeadlineExceededError(deadline), time.perf_counter() - start))
+        return results
+
+
+async def _ask_client(client, kwargs, ranker=None, position: int = 0):
+    """Query a single client, and returns either its Response, or an ErrorRecord.
+       The Response is also given to the ranker, if any.
+    """
+    start = time.perf_counter()
+    try:
+        response = await client.ask(**kwargs)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return ErrorRecord(client, e, time.perf_counter() - start)
+    if ranker is not None:
+        ranker.add(response, position)
+    return response
@@ -0,0 +1,247 @@
+"""Client balancing the queries across the replicas of a bot.
+
+A bot may be deployed on several replicas, or in several regions, each
+described by its own URL or Descriptor. The BalancedClient has the same
+interface as the Client, and routes each query to one of the replicas:
+
+    from openchatbotclient.balanced_client import BalancedClient
+
+    client = BalancedClient(['https://eu.bot.domain.com/api/ask',
+                             'https://us.bot.domain.com/api/ask'],
+                            policy='latency', sticky=True)
+    response = client.ask("my-userId", "hello")
+    print(response.client)     # The replica that answered
+
+The available policies are:
+    - round-robin: the replicas are queried in turn
+    - least-outstanding: the replica with the fewest queries in flight
+    - latency: the best of two random replicas (power of two choices), given
+      their average latency and their queries in flight
+
+With sticky routing, the queries of a given user always go to the same
+replica, as long as it is up, so that the context of the conversation is kept.
+
+The replicas whose circuit is open (see the health module) are skipped. The
+AsyncBalancedClient is the asyncio version, and may be used in an
+AsyncClientGroup.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
+
+import itertools
+import random
+import threading
+import zlib
+
+from .async_client import AsyncClient
+from .client import Client
+from .descriptor import Descriptor
+from .health import OPEN
+
+
+class BalancingPolicy:
+    """Parent of the policies choosing the replica of each query"""
+
+    def choose(self, client, candidates) -> int:
+        """returns the index of the replica to query, out of the
+           indexes of the candidate replicas
+        """
+        raise NotImplementedError()
+
+
+class RoundRobin(BalancingPolicy):
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, client, candidates) -> int:
+        return candidates[next(self._counter) % len(candidates)]
+
+
+class LeastOutstanding(BalancingPolicy):
+
+    def choose(self, client, candidates) -> int:
+        # Ties are broken randomly, so that idle replicas share the load
+        start = random.randrange(len(candidates))
+        candidates = candidates[start:] + candidates[:start]
+        return min(candidates, key=lambda index: client.outstanding[index])
+
+
+class PowerOfTwoChoices(BalancingPolicy):
+
+    def choose(self, client, candidates) -> int:
+        if len(candidates) == 1:
+            return candidates[0]
+        return min(random.sample(candidates, 2), key=client.get_cost)
+
+
+POLICIES = {
+    'round-robin': RoundRobin,
+    'least-outstanding': LeastOutstanding,
+    'latency': PowerOfTwoChoices,
+}
+
+
+class _Balancer:
+    """The routing of the queries, common to the sync and async clients"""
+
+    # The class of the replicas created from URLs or descriptors
+    replica_class = Client
+
+    def _init_replicas(self, replicas, policy, sticky: bool, hooks):
+        self.replicas = replicas
+        self.policy = POLICIES[policy]() if isinstance(policy, str) else policy
+        self.sticky = sticky
+
+        # Number of queries in flight to each replica
+        self.outstanding = [0] * len(self.replicas)
+        self._lock = threading.Lock()
+
+        # The policies and the circuit breakers need the health of the replicas
+        for replica in self.replicas:
+            replica.track_health()
+
+        for hook in hooks or ():
+            self.add_hook(hook)
+
+    @classmethod
+    def _get_replicas(cls, replicas, transport) -> list:
+        """returns the clients of the replicas, given as clients, descriptors or URLs"""
+        if not replicas:
+            raise ValueError("At least one replica is required")
+
+        clients = []
+        for replica in replicas:
+            if isinstance(replica, Client):
+                clients.append(replica)
+            elif isinstance(replica, Descriptor):
+                clients.append(cls.replica_class.from_descriptor(replica, transport=transport))
+            else:
+                clients.append(cls.replica_class.from_url(replica, transport=transport))
+        return clients
+
+    def add_hook(self, hook):
+        """Add a Hook instance, notified of each query to the replicas"""
+        super().add_hook(hook)
+        for replica in self.replicas:
+            replica.add_hook(hook)
+
+    def remove_hook(self, hook):
+        super().remove_hook(hook)
+        for replica in self.replicas:
+            replica.remove_hook(hook)
+
+    def get_cost(self, index: int) -> float:
+        """returns the expected cost of a query to a replica: its average
+           latency, times the queries waiting for it
+        """
+        health = self.replicas[index].health
+        latency = health.latency if health is not None and health.latency is not None else 0
+        return latency * (self.outstanding[index] + 1)
+
+    def _get_candidates(self):
+        """returns the indexes of the replicas that may be queried"""
+        candidates = [index for index, replica in enumerate(self.replicas)
+                      if replica.health is None or replica.health.state != OPEN
+                      or not replica.health.retry_after]
+        # When all the replicas are down, the query fails as usual
+        return candidates or list(range(len(self.replicas)))
+
+    def _acquire(self, params: dict) -> int:
+        """returns the index of the replica to query, counted as outstanding"""
+        candidates = self._get_candidates()
+
+        index = None
+        if self.sticky:
+            index = zlib.crc32(params['userId'].encode('utf-8')) % len(self.replicas)
+            if index not in candidates:
+                index = None
+
+        with self._lock:
+            if index is None:
+                index = self.policy.choose(self, candidates)
+            self.outstanding[index] += 1
+        return index
+
+    def _release(self, index: int):
+        with self._lock:
+            self.outstanding[index] -= 1
+
+
+class BalancedClient(_Balancer, Client):
+
+    def __init__(self, replicas, policy='round-robin', sticky: bool = False, transport=None,
+                 hooks=None, cache=None, single_flight=None):
+        """Create a client balancing the queries across replicas. The constructor parameters are:
+           - replicas: the list of the replicas of the bot, each one either a
+                       Client, a Descriptor, or the URL of the bot
+           - policy: either the name of a policy (round-robin, least-outstanding
+                     or latency), or a BalancingPolicy instance
+           - sticky: if True, the queries of a user always go to the same replica
+           - transport: optional, the transport shared by the replicas created
+                        from descriptors or URLs
+           - hooks: optional, a list of Hook instances notified of each query
+           - cache: optional, a ResponseCache instance
+           - single_flight: optional, a SingleFlight instance
+
+           The health of each replica is tracked by its own client. Closing the
+           balanced client closes all its replicas.
+        """
+        owns_transport = transport is None
+        transport = transport or self._create_transport()
+        replicas = self._get_replicas(replicas, transport)
+
+        # The logical bot is described by its first replica. The health
+        # is tracked by each replica.
+        first = replicas[0]
+        Client.__init__(self, first.host, first.port, first.api_path, descriptor=first.descriptor,
+                        transport=transport, cache=cache, single_flight=single_flight, health=False)
+        self._owns_transport = owns_transport
+        self._init_replicas(replicas, policy, sticky, hooks)
+
+    def __str__(self):
+        return "balanced_client('%s', %d replicas)" % (self.hostname, len(self.replicas))
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+        super().close()
+
+    def _ask(self, params: dict, method: str, timeout=None):
+        index = self._acquire(params)
+        try:
+            return self.replicas[index]._ask(params, method, timeout)
+        finally:
+            self._release(index)
+
+
+class AsyncBalancedClient(_Balancer, AsyncClient):
+
+    replica_class = AsyncClient
+
+    def __init__(self, replicas, policy='round-robin', sticky: bool = False, transport=None,
+                 hooks=None, cache=None, single_flight=None):
+        """Create an async client balancing the queries across replicas. The
+           constructor parameters are the same as for BalancedClient, except
+           that the replicas are AsyncClient instances
+        """
+        replicas = self._get_replicas(replicas, transport)
+
+        first = replicas[0]
+        AsyncClient.__init__(self, first.host, first.port, first.api_path, descriptor=first.descriptor,
+                             transport=transport, cache=cache, single_flight=single_flight, health=False)
+        self._init_replicas(replicas, policy, sticky, hooks)
+
+    def __str__(self):
+        return "async_balanced_client('%s', %d replicas)" % (self.hostname, len(self.replicas))
+
+    async def _ask(self, params: dict, method: str, timeout=None):
+        index = self._acquire(params)
+        try:
+            return await self.replicas[index]._ask(params, method, timeout)
+        finally:
+            self._release(index)
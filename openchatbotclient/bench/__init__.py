@@ -0,0 +1,14 @@
+"""Benchmarks of the Open Chat Bot client.
+
+The benchmarks run against local stub servers (see the stub module), so that
+their results do not depend on remote bots, and may be compared over time:
+
+    python -m openchatbotclient.bench.suite --output results.json
+    python -m openchatbotclient.bench.suite --compare results.json
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
@@ -0,0 +1,338 @@
+"""Load generator, to test the capacity of a bot.
+
+    python -m openchatbotclient.bench https://bot.domain.com/api/ask --rate 50 --duration 60
+    python -m openchatbotclient.bench bot.domain.com --users 20 --corpus queries.txt --method post
+
+The target is either the URL of the ask API, the path of a descriptor file,
+or a domain whose descriptor is looked up.
+
+The load is either:
+    - open loop (--rate): queries are sent at a fixed rate, whatever the
+      latency of the bot. The latency of each query is measured from the time
+      it was scheduled, not from the time it was sent, so that the queries
+      delayed because the bot (or the load generator) was saturated are
+      accounted for. This avoids the coordinated omission, where a slow bot
+      would reduce the load, and hide its own latency.
+    - closed loop (--users): each virtual user sends its next query as soon
+      as it receives the answer to the previous one. The latency is then the
+      service time of the bot, and the throughput its capacity.
+
+The queries are read from the corpus file, one per line, in turn. The
+throughput and latency are reported every few seconds, then a final report
+gives the latency histogram, and the errors by ChatbotServerError code.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The percentiles are capped at the maximum latency
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import codec
+from ..client import Client
+from ..descriptor import Descriptor
+from ..exception import ChatbotServerError
+from ..metrics import Histogram
+from ..repository import Repository
+from ..transport import Transport
+
+# Duration of the test, in seconds
+DURATION_DEFAULT = 10
+
+# Interval between two live reports, in seconds
+INTERVAL_DEFAULT = 1
+
+# Number of queries in flight at most, in open loop
+CONNECTIONS_DEFAULT = 64
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Stats:
+    """The results of the queries, thread safe"""
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.count = 0
+        self.max = 0.0
+        # Number of errors, by ChatbotServerError code, or by exception name
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, latency: float, error: Exception = None):
+        with self._lock:
+            self.count += 1
+            if error is None:
+                self.histogram.add(latency)
+                self.max = max(self.max, latency)
+            else:
+                key = 'code %s' % error.status if isinstance(error, ChatbotServerError) else type(error).__name__
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def reset(self):
+        """returns a copy of the statistics, and resets them"""
+        with self._lock:
+            copy = Stats()
+            copy.histogram, self.histogram = self.histogram, Histogram()
+            copy.count, self.count = self.count, 0
+            copy.max, self.max = self.max, 0.0
+            copy.errors, self.errors = self.errors, {}
+        return copy
+
+    def merge(self, other):
+        with self._lock:
+            self.histogram.merge(other.histogram)
+            self.count += other.count
+            self.max = max(self.max, other.max)
+            for key, count in other.errors.items():
+                self.errors[key] = self.errors.get(key, 0) + count
+
+    def get_percentile(self, percentile: float) -> float:
+        """returns the estimated latency below which percentile % of the queries
+           succeeded, at most the maximum latency observed
+        """
+        value = self.histogram.get_percentile(percentile)
+        return min(value, self.max) if value is not None else None
+
+    def to_json(self, elapsed: float) -> dict:
+        histogram = self.histogram
+        return {
+            'queries': self.count,
+            'successes': histogram.count,
+            'errors': dict(self.errors),
+            'throughput_qps': self.count / elapsed if elapsed else 0.0,
+            'latency_ms': dict(
+                [('p%s' % p, _ms(self.get_percentile(p))) for p in PERCENTILES]
+                + [('mean', _ms(histogram.sum / histogram.count) if histogram.count else None),
+                   ('max', _ms(self.max))]),
+            'histogram': [{'le_ms': _ms(bound), 'count': count}
+                          for bound, count in zip(histogram.BOUNDS + [math.inf], histogram.counts) if count],
+        }
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+class LoadGenerator:
+
+    def __init__(self, client: Client, queries, method: str = 'get', lang: str = None,
+                 duration: float = DURATION_DEFAULT, rate: float = None, users: int = 1,
+                 connections: int = CONNECTIONS_DEFAULT, timeout: float = None, user_id: str = 'loadgen'):
+        """Create a load generator. The constructor parameters are:
+           - client: the client of the tested bot
+           - queries: the list of the queries to send, in turn
+           - method: get or post
+           - lang: optional, the language of the queries
+           - duration: the duration of the test, in seconds
+           - rate: the number of queries per second, in open loop. If None,
+                   the test runs in closed loop
+           - users: the number of virtual users, in closed loop
+           - connections: the number of queries in flight at most, in open loop
+           - timeout: optional, the timeout of each query in seconds
+           - user_id: the prefix of the userId of the queries
+        """
+        if not queries:
+            raise ValueError("At least one query is required")
+        self.client = client
+        self.queries = queries
+        self.method = method
+        self.lang = lang
+        self.duration = duration
+        self.rate = rate
+        self.users = users
+        self.connections = connections
+        self.timeout = timeout
+        self.user_id = user_id
+
+        # The statistics since the last live report, and of the whole test
+        self.interval = Stats()
+        self.total = Stats()
+
+        self._queries = itertools.cycle(queries)
+        self._lock = threading.Lock()
+
+    def _next_query(self) -> str:
+        with self._lock:
+            return next(self._queries)
+
+    def _ask(self, user: int, scheduled: float):
+        """Send one query. The latency is measured from the scheduled time"""
+        error = None
+        try:
+            self.client.ask('%s-%d' % (self.user_id, user), self._next_query(), lang=self.lang,
+                            method=self.method, timeout=self.timeout)
+        except Exception as e:
+            error = e
+        self.interval.add(time.perf_counter() - scheduled, error)
+
+    def run(self, report=None, interval: float = INTERVAL_DEFAULT) -> dict:
+        """Run the test, calling report(elapsed, stats, duration) at each interval
+           with the statistics of the interval and its actual duration, and
+           returns the final statistics as a dict
+        """
+        start = time.perf_counter()
+        end = start + self.duration
+
+        if self.rate:
+            thread = threading.Thread(target=self._run_open_loop, args=(start, end), daemon=True)
+        else:
+            thread = threading.Thread(target=self._run_closed_loop, args=(end,), daemon=True)
+        thread.start()
+
+        next_report = start + interval
+        while thread.is_alive():
+            thread.join(max(0, next_report - time.perf_counter()))
+            now = time.perf_counter()
+            if now >= next_report or not thread.is_alive():
+                stats = self.interval.reset()
+                self.total.merge(stats)
+                if report:
+                    report(now - start, stats, now - next_report + interval)
+                next_report += interval
+
+        elapsed = time.perf_counter() - start
+        results = self.total.to_json(elapsed)
+        results.update({
+            'target': self.client.base_url,
+            'method': self.method,
+            'mode': 'open' if self.rate else 'closed',
+            'rate': self.rate,
+            'users': None if self.rate else self.users,
+            'duration': elapsed,
+        })
+        return results
+
+    def _run_open_loop(self, start: float, end: float):
+        period = 1 / self.rate
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            for index in itertools.count():
+                scheduled = start + index * period
+                if scheduled >= end:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # When all the connections are busy the query waits in the
+                # executor queue, and this wait is part of its latency
+                executor.submit(self._ask, index % self.connections, scheduled)
+
+    def _run_closed_loop(self, end: float):
+        def user(index):
+            while time.perf_counter() < end:
+                self._ask(index, time.perf_counter())
+
+        threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+def get_client(target: str, scheme: str = 'https', connections: int = CONNECTIONS_DEFAULT) -> Client:
+    """returns the client of a target: the URL of the ask API, the path of
+       a descriptor file, or a domain whose descriptor is looked up
+    """
+    transport = Transport(pool_maxsize=connections)
+    if target.startswith(('http://', 'https://')):
+        client = Client.from_url(target, transport=transport)
+    elif os.path.isfile(target):
+        with open(target, 'rb') as f:
+            client = Client.from_descriptor(Descriptor(codec.loads(f.read())), transport=transport)
+    else:
+        with Repository(scheme=scheme) as repository:
+            client = Client.from_descriptor(repository.get_descriptor(target), transport=transport)
+    client._owns_transport = True
+    return client
+
+
+def read_corpus(path: str) -> list:
+    """returns the queries of a corpus file, one per line"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def format_report(results: dict) -> str:
+    lines = [
+        'Target:      %s (%s, %s loop)' % (results['target'], results['method'].upper(), results['mode']),
+        'Duration:    %.1fs' % results['duration'],
+        'Queries:     %d (%d successes)' % (results['queries'], results['successes']),
+        'Throughput:  %.1f queries/s' % results['throughput_qps'],
+        'Latency:',
+    ]
+    for name, value in results['latency_ms'].items():
+        lines.append('    %-8s %s' % (name, '%10.2f ms' % value if value is not None else '         -'))
+
+    histogram = results['histogram']
+    if histogram:
+        lines.append('Histogram:')
+        largest = max(bucket['count'] for bucket in histogram)
+        for bucket in histogram:
+            bar = '#' * max(1, round(40 * bucket['count'] / largest))
+            lines.append('    <= %10.2f ms %8d %s' % (bucket['le_ms'], bucket['count'], bar))
+
+    if results['errors']:
+        lines.append('Errors:')
+        for key, count in sorted(results['errors'].items(), key=lambda item: -item[1]):
+            lines.append('    %-24s %8d' % (key, count))
+    return '\n'.join(lines)
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m openchatbotclient.bench',
+                                     description='Generate load on an Open Chat Bot')
+    parser.add_argument('target', help='the URL of the ask API, a descriptor file, or a domain')
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--rate', type=float, help='open loop: the number of queries per second')
+    load.add_argument('--users', type=int, default=1, help='closed loop: the number of virtual users')
+    parser.add_argument('--corpus', help='a file of queries, one per line. Default is "hello"')
+    parser.add_argument('--method', choices=('get', 'post'), default='get')
+    parser.add_argument('--lang', help='the language of the queries')
+    parser.add_argument('--duration', type=float, default=DURATION_DEFAULT, help='in seconds')
+    parser.add_argument('--connections', type=int, default=CONNECTIONS_DEFAULT,
+                        help='open loop: the number of queries in flight at most')
+    parser.add_argument('--timeout', type=float, help='the timeout of each query, in seconds')
+    parser.add_argument('--interval', type=float, default=INTERVAL_DEFAULT, help='the interval of the live reports')
+    parser.add_argument('--scheme', default='https', help='the scheme of the descriptor lookup of a domain')
+    parser.add_argument('--json', help='the file where the final results are written as JSON, - for stdout')
+    options = parser.parse_args(arguments)
+
+    queries = read_corpus(options.corpus) if options.corpus else ['hello']
+    connections = options.connections if options.rate else options.users
+    client = get_client(options.target, scheme=options.scheme, connections=connections)
+
+    generator = LoadGenerator(client, queries, method=options.method, lang=options.lang,
+                              duration=options.duration, rate=options.rate, users=options.users,
+                              connections=options.connections, timeout=options.timeout)
+
+    def report(elapsed, stats, interval):
+        p50, p99 = (_ms(stats.get_percentile(p)) for p in (50, 99))
+        print('[%6.1fs] %8.1f queries/s   p50 %s   p99 %s   errors %d' % (
+            elapsed, stats.count / interval if interval > 0 else 0.0,
+            '%8.2f ms' % p50 if p50 is not None else '       -', '%8.2f ms' % p99 if p99 is not None else '       -',
+            sum(stats.errors.values())), file=sys.stderr, flush=True)
+
+    try:
+        results = generator.run(report=report, interval=options.interval)
+    finally:
+        client.close()
+
+    print(format_report(results), file=sys.stderr)
+    if options.json == '-':
+        print(json.dumps(results, indent=2))
+    elif options.json:
+        with open(options.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
@@ -0,0 +1,394 @@
+"""Benchmark suite of the Open Chat Bot client.
+
+Each scenario drives the Client, ClientGroup or Repository against stub
+servers running in child processes, and returns its metrics. The results
+are written as JSON, and may be compared with the results of a previous
+run to catch the regressions:
+
+    python -m openchatbotclient.bench.suite --output baseline.json
+    python -m openchatbotclient.bench.suite --compare baseline.json --tolerance 0.2
+
+The metrics are named after their unit: the ones ending with _qps (queries
+per second) are better when higher, the ones ending with _ms or _bytes are
+better when lower. The --quick option runs fewer queries, for a smoke test.
+
+Some metrics also have an absolute budget, such as the time to import the
+client: the command fails when a budget is exceeded.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: Adding the import time scenario, and the budgets
+    - 2026/10/18: Adding the client_throttled scenario
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from .. import codec
+from ..client import Client
+from ..client_group import ClientGroup
+from ..descriptor_cache import DescriptorCache
+from ..exception import RateLimitError
+from ..health import Health
+from ..limiter import Limiter
+from ..repository import Repository
+from ..response import ErrorRecord
+from ..strategy import FirstSuccess
+from ..stub import StubProcess
+from ..transport import Transport
+
+# Maximum relative degradation of a metric before it is reported as a regression
+TOLERANCE_DEFAULT = 0.2
+
+# The scenarios, by name, in order of execution
+SCENARIOS = {}
+
+# The maximum values of some metrics, by scenario
+BUDGETS = {
+    'import_time': {
+        'import_ms': 30,
+        # The modules long to import are only imported when needed
+        'heavy_modules': 0,
+    },
+    'client_throttled': {
+        # The queries throttled by the limiter are not errors of the bot
+        'circuit_open': 0,
+    },
+}
+
+# The modules that must not be imported with the client
+HEAVY_MODULES = ('requests', 'urllib3', 'asyncio', 'httpx', 'concurrent.futures')
+
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from openchatbotclient import Client
+elapsed = time.perf_counter() - start
+print(elapsed, sum(module in sys.modules for module in %r))
+""" % (HEAVY_MODULES,)
+
+
+def scenario(function):
+    """Register a scenario: a function given the scale of the run, and
+       returning a dict of metrics
+    """
+    SCENARIOS[function.__name__] = function
+    return function
+
+
+def get_latency_metrics(latencies) -> dict:
+    """returns the mean and percentiles of latencies in seconds, in milliseconds"""
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    return {
+        'mean_ms': sum(latencies) * 1000 / len(latencies),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+    }
+
+
+def _count(scale: float, count: int) -> int:
+    return max(10, int(count * scale))
+
+
+def _ask_sequentially(client, count: int, method: str = 'get') -> dict:
+    for i in range(20):
+        client.ask("bench", "warm up", method=method)
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        query_start = time.perf_counter()
+        client.ask("bench", "hello %d" % i, method=method)
+        latencies.append(time.perf_counter() - query_start)
+    elapsed = time.perf_counter() - start
+
+    metrics = {'queries': count, 'throughput_qps': count / elapsed}
+    metrics.update(get_latency_metrics(latencies))
+    return metrics
+
+
+@scenario
+def import_time(scale: float) -> dict:
+    """Time to import the client, in a fresh interpreter"""
+    times = []
+    for _ in range(5):
+        output = subprocess.check_output([sys.executable, '-c', _IMPORT_SCRIPT], universal_newlines=True)
+        elapsed, heavy_modules = output.split()
+        times.append(float(elapsed))
+    return {'import_ms': min(times) * 1000, 'heavy_modules': int(heavy_modules)}
+
+
+@scenario
+def client_get(scale: float) -> dict:
+    """Sequential GET queries, without server latency: the overhead of the client"""
+    with StubProcess() as server, Client(server.host, server.port) as client:
+        return _ask_sequentially(client, _count(scale, 2000))
+
+
+@scenario
+def client_post(scale: float) -> dict:
+    """Sequential POST queries, without server latency"""
+    with StubProcess() as server, Client(server.host, server.port) as client:
+        return _ask_sequentially(client, _count(scale, 2000), method='post')
+
+
+@scenario
+def client_throughput(scale: float) -> dict:
+    """Parallel queries with ask_many, against a bot with latency and jitter"""
+    count = _count(scale, 3000)
+    concurrency = 32
+    with StubProcess(latency=0.005, jitter=0.005, seed=1) as server, \
+            Client(server.host, server.port, transport=Transport(pool_maxsize=concurrency)) as client:
+        start = time.perf_counter()
+        errors = sum(isinstance(result, ErrorRecord)
+                     for result in client.ask_many((("bench", "hello %d" % i) for i in range(count)),
+                                                   concurrency=concurrency, ordered=False))
+        elapsed = time.perf_counter() - start
+    return {'queries': count, 'errors': errors, 'throughput_qps': count / elapsed}
+
+
+@scenario
+def client_errors(scale: float) -> dict:
+    """Parallel queries against a bot failing 10% of the time"""
+    count = _count(scale, 1000)
+    with StubProcess(error_rate=0.1, seed=1) as server, \
+            Client(server.host, server.port, transport=Transport(pool_maxsize=8), health=False) as client:
+        start = time.perf_counter()
+        errors = sum(isinstance(result, ErrorRecord)
+                     for result in client.ask_many((("bench", "hello %d" % i) for i in range(count)),
+                                                   concurrency=8, ordered=False))
+        elapsed = time.perf_counter() - start
+    return {'queries': count, 'error_rate': errors / count, 'throughput_qps': count / elapsed}
+
+
+@scenario
+def client_throttled(scale: float) -> dict:
+    """Parallel queries throttled by the limiter of a healthy bot: the circuit must stay closed"""
+    count = _count(scale, 500)
+    with StubProcess() as server, \
+            Client(server.host, server.port, transport=Transport(pool_maxsize=8), health=Health(),
+                   limiter=Limiter(rate=10, burst=1)) as client:
+        start = time.perf_counter()
+        throttled = sum(isinstance(result, ErrorRecord) and isinstance(result.error, RateLimitError)
+                        for result in client.ask_many((("bench", "hello %d" % i) for i in range(count)),
+                                                      concurrency=8, ordered=False, timeout=0.5))
+        elapsed = time.perf_counter() - start
+        circuit_open = not client.health.is_healthy
+    return {'queries': count, 'throttled': throttled, 'circuit_open': int(circuit_open),
+            'throughput_qps': count / elapsed}
+
+
+def _ask_group(servers, count: int, **kwargs) -> dict:
+    group = ClientGroup()
+    for server in servers:
+        group.append(Client(server.host, server.port))
+
+    latencies = []
+    errors = 0
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            responses = group.ask("bench", "hello %d" % i, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            errors += len(responses.errors)
+    finally:
+        for client in group:
+            client.close()
+
+    metrics = {'queries': count, 'errors': errors}
+    metrics.update(get_latency_metrics(latencies))
+    return metrics
+
+
+def _start_bots(count: int, **kwargs):
+    servers = []
+    try:
+        for seed in range(count):
+            servers.append(StubProcess(seed=seed, **kwargs).start())
+    except Exception:
+        _stop_bots(servers)
+        raise
+    return servers
+
+
+def _stop_bots(servers):
+    for server in servers:
+        server.stop()
+
+
+@scenario
+def group_concurrent(scale: float) -> dict:
+    """Concurrent queries to a group of 4 bots with jitter: the group is as slow as the slowest bot"""
+    servers = _start_bots(4, latency=0.01, jitter=0.02)
+    try:
+        return _ask_group(servers, _count(scale, 200), concurrent=True)
+    finally:
+        _stop_bots(servers)
+
+
+@scenario
+def group_first_success(scale: float) -> dict:
+    """Queries to a group of 4 bots with jitter, answered by the fastest one"""
+    servers = _start_bots(4, latency=0.01, jitter=0.02)
+    try:
+        return _ask_group(servers, _count(scale, 200), strategy=FirstSuccess())
+    finally:
+        _stop_bots(servers)
+
+
+@scenario
+def repository_lookup(scale: float) -> dict:
+    """Lookups of descriptors, without and with cache"""
+    count = _count(scale, 1000)
+    metrics = {'lookups': count}
+    with StubProcess() as server:
+        domain = '127.0.0.1:%d' % server.port
+        for name, cache in (('uncached', None), ('cached', DescriptorCache())):
+            with Repository(cache=cache, scheme='http') as repository:
+                start = time.perf_counter()
+                for _ in range(count):
+                    repository.get_descriptor(domain)
+                metrics['%s_throughput_qps' % name] = count / (time.perf_counter() - start)
+    return metrics
+
+
+@scenario
+def response_memory(scale: float) -> dict:
+    """Memory used by the responses kept, with 2KB of medias each"""
+    count = _count(scale, 1000)
+    with StubProcess(payload_size=2048) as server, Client(server.host, server.port) as client:
+        client.ask("bench", "warm up")
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            responses = [client.ask("bench", "hello %d" % i) for i in range(count)]
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'responses': len(responses),
+        'per_response_bytes': (current - before) / count,
+        'peak_bytes': peak - before,
+    }
+
+
+def run(names=None, scale: float = 1.0, log=None) -> dict:
+    """Run the scenarios, all of them by default, and returns the results"""
+    results = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'codec': codec.get_codec().name,
+            'scale': scale,
+        },
+        'scenarios': {},
+    }
+    for name in names or SCENARIOS:
+        if log:
+            log("Running %s..." % name)
+        results['scenarios'][name] = SCENARIOS[name](scale)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE_DEFAULT) -> list:
+    """returns the regressions of results from the baseline, as a list of
+       (scenario, metric, baseline value, value) tuples
+    """
+    regressions = []
+    for name, metrics in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name, {})
+        for metric, value in metrics.items():
+            previous = reference.get(metric)
+            if not previous:
+                continue
+            if metric.endswith('_qps'):
+                regressed = value < previous * (1 - tolerance)
+            elif metric.endswith(('_ms', '_bytes')):
+                regressed = value > previous * (1 + tolerance)
+            else:
+                regressed = False
+            if regressed:
+                regressions.append((name, metric, previous, value))
+    return regressions
+
+
+def check_budgets(results: dict) -> list:
+    """returns the metrics exceeding their budget, as a list of
+       (scenario, metric, budget, value) tuples
+    """
+    exceeded = []
+    for name, budgets in BUDGETS.items():
+        metrics = results['scenarios'].get(name, {})
+        for metric, budget in budgets.items():
+            value = metrics.get(metric)
+            if value is not None and value > budget:
+                exceeded.append((name, metric, budget, value))
+    return exceeded
+
+
+def format_results(results: dict) -> str:
+    lines = []
+    for name, metrics in results['scenarios'].items():
+        lines.append(name)
+        for metric, value in metrics.items():
+            lines.append('    %-28s %12.3f' % (metric, value))
+    return '\n'.join(lines)
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m openchatbotclient.bench.suite',
+                                     description='Run the benchmarks of the Open Chat Bot client')
+    parser.add_argument('--output', help='the file where the results are written as JSON, - for stdout')
+    parser.add_argument('--compare', help='the JSON file of a previous run, to report the regressions')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_DEFAULT,
+                        help='the relative degradation reported as a regression, default is %s' % TOLERANCE_DEFAULT)
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='a scenario to run, default is all of them')
+    parser.add_argument('--quick', action='store_true', help='run fewer queries')
+    options = parser.parse_args(arguments)
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    results = run(options.scenario, scale=0.1 if options.quick else 1.0, log=log)
+    log(format_results(results))
+
+    if options.output == '-':
+        print(json.dumps(results, indent=2))
+    elif options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for name, metric, budget, value in check_budgets(results):
+        log("Budget exceeded in %s: %s is %.3f, for a budget of %.3f" % (name, metric, value, budget))
+        failed = True
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.tolerance)
+        for name, metric, previous, value in regressions:
+            log("Regression in %s: %s went from %.3f to %.3f" % (name, metric, previous, value))
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,23 +18,70 @@ History:
     - 2019/11/01: Alexander: Initial class implementation
     - 2020/11/02: Amédée: Renaming class to "client"
     - 2020/11/02: Amédée: Adding the "from_descriptor" static method
+    - 2026/10/18: Queries are sent through a pooled, keep-alive transport
+    - 2026/10/18: Adding the "ask_many" method
+    - 2026/10/18: JSON is encoded and decoded with the codec module
+    - 2026/10/18: Adding the hooks, see the metrics module
+    - 2026/10/18: Adding the response cache
+    - 2026/10/18: Adding the single-flight mode
+    - 2026/10/18: Adding the health of the bot, and its circuit breaker
+    - 2026/10/18: The health is opt-in for a standalone client
+    - 2026/10/18: Adding the hedging policy
+    - 2026/10/18: Adding the "ask_stream" method
+    - 2026/10/18: Faster import, concurrent.futures is imported when needed
+    - 2026/10/18: Adding the rate and concurrency limiter
+    - 2026/10/18: Adding the "session" method, see the conversation module
+    - 2026/10/18: The limiter is applied to each hedged query, and the overload
+                  HTTP codes are raised as ChatbotServerError
 """
 
-import json
-import requests
+import time
+
+from . import codec
 
 from .descriptor import Descriptor, ENDPOINT_DEFAULT
 
-from .exception import ChatbotServerError
+from .exception import ChatbotServerError, CircuitOpenError, RateLimitError
+
+from .health import Health
+
+from .limiter import OVERLOAD_CODES, get_wait_timeout
+
+from .metrics import CallRecord
+
+from .stream import ACCEPT, StreamingResponse
+
+from .transport import Transport
+
+# Number of queries sent in parallel by ask_many
+CONCURRENCY_DEFAULT = 8
 
 class Client:
-    def __init__(self, host: str, port: int = 0, path: str = None, descriptor: Descriptor = None):
+    def __init__(self, host: str, port: int = 0, path: str = None, descriptor: Descriptor = None,
+                 transport: Transport = None, hooks=None, cache=None,
+                 single_flight=None, health=None, hedging=None, limiter=None):
         """Create a client that may be queried. The constructor parameters are:
            - host: a host in the format protocol://domain, such as:
               https://konverso.ai
            - port: optional, only required if using none standard ports (i.e 8443 for example)
            - path: the endpoint, defaults to /api/ask
            - descriptor: optional, a descriptor instance
+           - transport: optional, a transport instance shared with other clients.
+                        By default, the client creates and owns its own transport.
+           - hooks: optional, a list of Hook instances (see the metrics module)
+                    notified of each query
+           - cache: optional, a ResponseCache instance, answering the queries
+                    already sent without querying the bot
+           - single_flight: optional, a SingleFlight instance, coalescing the
+                            identical queries in flight
+           - health: optional, a Health instance tracking the errors and latencies
+                     of the bot, and failing fast when it is down. By default
+                     the health is only tracked once the client is added to a
+                     client group. False disables it, even in a group.
+           - hedging: optional, a HedgingPolicy instance, sending a second query
+                      to the bot when the first one is slow
+           - limiter: optional, a Limiter instance, possibly shared by many clients,
+                      limiting the rate and the concurrency of the queries to the bot
 
         See also the fromDescriptor method to get a client.
         """
@@ -75,14 +122,66 @@ class Client:
         #
         self.avatar = None
 
+        # Pooled connections to the bot. A transport given by the caller
+        # is not closed with the client.
+        #
+        self._owns_transport = transport is None
+        self.transport = transport or self._create_transport()
+
+        self.hooks = list(hooks or [])
+
+        self.cache = cache
+        self.single_flight = single_flight
+
+        # A standalone client queries its bot whatever its health: the client
+        # groups enable it, see track_health
+        self.health = health or None
+        self._health_disabled = health is False
+
+        self.hedging = hedging
+
+        self.limiter = limiter
+
     def __str__(self):
         # We extract the actual hostname.domain from the host
         # https://myhost.mydomain => myhost.mydomain
         #
         return "client('%s')" % self.hostname
 
-    @staticmethod
-    def from_descriptor(descriptor):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create_transport(self):
+        return Transport()
+
+    def track_health(self):
+        """Track the health of the bot, unless disabled with health=False.
+           returns the Health instance, or None
+        """
+        if self.health is None and not self._health_disabled:
+            self.health = Health()
+        return self.health
+
+    def add_hook(self, hook):
+        """Add a Hook instance, notified of each query"""
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def close(self):
+        """Release the connections of this client, unless its transport
+           is shared with other clients
+        """
+        if self._owns_transport:
+            self.transport.close()
+
+    @classmethod
+    def from_descriptor(cls, descriptor, transport: Transport = None):
         """Given a "descriptor" instance, returns a new "client" instance"""
 
         # Import it here to avoid any cyclic import
@@ -90,13 +189,14 @@ class Client:
 
         assert isinstance(descriptor, Descriptor)
 
-        return Client(host=descriptor.host,
-                      port=descriptor.port,
-                      path=descriptor.endpoint,
-                      descriptor=descriptor)
+        return cls(host=descriptor.host,
+                   port=descriptor.port,
+                   path=descriptor.endpoint,
+                   descriptor=descriptor,
+                   transport=transport)
 
-    @staticmethod
-    def from_url(url):
+    @classmethod
+    def from_url(cls, url, transport: Transport = None):
         """Given a "descriptor" instance, returns a new "client" instance"""
 
         # Extracting from the URL the protocol, the domain, the path
@@ -117,12 +217,14 @@ class Client:
             port = None
         else:
             domain, port = domainport_tokens
+            port = int(port)
 
         path = tokens[3]
 
-        return Client(host='%s//%s' % (protocol, domain),
-                      port=port,
-                      path=path)
+        return cls(host='%s//%s' % (protocol, domain),
+                   port=port,
+                   path=path,
+                   transport=transport)
 
     @property
     def base_url(self) -> str:
@@ -168,6 +270,214 @@ class Client:
           Output:
             - json with response data or exception
         """
+        params = self._get_params(userId, query, lang, location)
+
+        cache_key = self.cache.get_key(self, params, method) if self.cache is not None else None
+        if cache_key is not None:
+            response = self.cache.get(cache_key)
+            if response is not None:
+                return response.copy(self, user_id=userId, latency=0)
+
+        if self.single_flight is not None:
+            flight_key = self.single_flight.get_key(self, params)
+            response, shared = self.single_flight.do(flight_key, self._ask, params, method, timeout,
+                                                     timeout=timeout)
+            if shared:
+                response = response.copy(self, user_id=userId)
+        else:
+            response = self._ask(params, method, timeout)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, response)
+        return response
+
+    def _ask(self, params: dict, method: str, timeout=None):
+        """Send the query to the bot, notifying the hooks and tracking the health
+           of the bot, and returns its Response
+        """
+        health = self.health
+        if health is not None and not health.allow_request():
+            raise CircuitOpenError(self.base_url, health.retry_after)
+
+        # Each query sent, including the hedged ones, waits for the limiter
+        send = self._send if self.limiter is None else self._send_limited
+
+        record = CallRecord(self, method) if self.hooks else None
+        start = time.perf_counter()
+        try:
+            if self.hedging is not None:
+                response = self.hedging.call(method, send, params, method, timeout, record=record,
+                                             url=self.base_url)
+            else:
+                response = send(params, method, timeout, record)
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                raise
+            if isinstance(e, RateLimitError):
+                # The query was not sent: the bot is not to blame, and the
+                # hooks are not notified
+                if health is not None:
+                    health.cancel_request()
+                record = None
+                raise
+            if health is not None:
+                health.record_failure()
+            if record is not None:
+                self._record_error(record, e)
+            raise
+        else:
+            latency = time.perf_counter() - start
+            if health is not None:
+                health.record_success(latency)
+        finally:
+            if record is not None:
+                record.total = time.perf_counter() - start
+                self._notify(record)
+        return response
+
+    def _send_limited(self, params: dict, method: str, timeout=None, record: CallRecord = None):
+        """Send the query to the bot once its limiter allows it. Raises a
+           RateLimitError if it does not within the timeout
+        """
+        limit = self.limiter.get(self.base_url)
+        sent = limit.acquire(get_wait_timeout(timeout))
+        try:
+            response = self._send(params, method, timeout, record)
+        except BaseException as e:
+            limit.release(sent, error=e)
+            raise
+        limit.release(sent, time.perf_counter() - sent)
+        return response
+
+    def _send(self, params: dict, method: str, timeout=None, record: CallRecord = None):
+        """Send the query to the bot, and returns its Response. The details of
+           the query are kept in the record, if any
+        """
+        start = time.perf_counter()
+        data = None
+        if method == 'get':
+            #print(self.base_url)
+            #print(params)
+            r = self.transport.get("%s"%(self.base_url), params=params, timeout=timeout)
+        elif method == 'post':
+            data = codec.dumps(params)
+            r = self.transport.post("%s"%(self.base_url), data=data, headers=self._headers, timeout=timeout)
+        else:
+            raise RuntimeError("Unknown method '%s'"%(method))
+        latency = time.perf_counter() - start
+
+        if record is not None:
+            self._record_response(record, r, data, self.transport.timings)
+
+        response = self._get_response(r, latency)
+
+        if record is not None:
+            record.code = response.code
+        return response
+
+    @staticmethod
+    def _record_response(record: CallRecord, r, data, timings):
+        """Keep the details of the HTTP response in the record"""
+        record.connect = timings.connect
+        record.tls = timings.tls
+        record.ttfb = timings.ttfb
+        record.status_code = r.status_code
+        if data is not None:
+            record.request_size = len(data)
+        else:
+            record.request_size = len(str(r.request.url).partition('?')[2])
+        record.response_size = len(r.content)
+
+    @staticmethod
+    def _record_error(record: CallRecord, error: Exception):
+        record.error = type(error).__name__
+        if isinstance(error, ChatbotServerError):
+            record.code = error.status
+
+    def _notify(self, record: CallRecord):
+        for hook in self.hooks:
+            hook.on_call(record)
+
+    def session(self, userId: str, lang: str = None, location: str = None, method: str = 'get', timeout=None,
+                send_context: bool = False, transport=None):
+        """Returns a Conversation of the user with the bot (see the conversation
+           module), keeping the defaults of the user, the context returned by the
+           bot, and its own keep-alive connection
+        """
+        from .conversation import Conversation
+        return Conversation(self, userId, lang=lang, location=location, method=method, timeout=timeout,
+                            send_context=send_context, transport=transport)
+
+    def ask_stream(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+                   timeout=None):
+        """Invoke request to bot, and returns a StreamingResponse (see the stream
+           module) as soon as the headers of its answer are received. The body
+           is then read incrementally:
+
+               with client.ask_stream("my-userId", "hello") as stream:
+                   print(stream.get_text())
+        """
+        params = self._get_params(userId, query, lang, location)
+        headers = {'Accept': ACCEPT}
+
+        start = time.perf_counter()
+        if method == 'get':
+            r = self.transport.get(self.base_url, params=params, headers=headers, timeout=timeout, stream=True)
+        elif method == 'post':
+            r = self.transport.post(self.base_url, data=codec.dumps(params), headers=dict(self._headers, **headers),
+                                    timeout=timeout, stream=True)
+        else:
+            raise RuntimeError("Unknown method '%s'"%(method))
+        return StreamingResponse(self, r, start)
+
+    def ask_many(self, queries, concurrency: int = CONCURRENCY_DEFAULT, ordered: bool = True,
+                 lang: str = None, location: str = None, method: str = 'get', timeout=None):
+        """Invoke many requests to the bot, in parallel.
+           Input parameters:
+            - queries : an iterable of (userId, query) pairs, or of dicts with
+                        the parameters of the ask method
+            - concurrency : the number of requests sent in parallel
+            - ordered : if True, the results are yielded in the order of the queries.
+                        Otherwise they are yielded as soon as they are received
+            - lang, location, method, timeout : the defaults of all the queries
+          Output:
+            - a generator of Response, or of ErrorRecord for the failed queries
+
+        The queries are read lazily from the iterable, so that any number of them
+        may be sent in constant memory. The connections are reused between queries,
+        up to the pool size of the transport: it should not be lower than the
+        concurrency.
+        """
+        defaults = dict(lang=lang, location=location, method=method, timeout=timeout)
+
+        def ask(item):
+            kwargs = self._get_query_kwargs(item, defaults)
+            start = time.perf_counter()
+            try:
+                return self.ask(**kwargs)
+            except Exception as e:
+                # Inner import to avoid cyclic include
+                from .response import ErrorRecord
+                return ErrorRecord(self, e, time.perf_counter() - start,
+                                   user_id=kwargs.get('userId'), query=kwargs.get('query'))
+
+        # Inner import, as concurrent.futures is long to import
+        from .concurrency import imap
+
+        for _, result in imap(ask, queries, workers=concurrency, ordered=ordered):
+            yield result
+
+    @staticmethod
+    def _get_query_kwargs(item, defaults: dict):
+        """Given an item of ask_many, returns the parameters of ask"""
+        if isinstance(item, dict):
+            return dict(defaults, **item)
+        userId, query = item
+        return dict(defaults, userId=userId, query=query)
+
+    @staticmethod
+    def _get_params(userId: str, query: str, lang: str = None, location: str = None):
+        """Validate the query and returns the parameters to send to the bot"""
         if not userId:
             raise RuntimeError("userId is empty")
 
@@ -180,18 +490,24 @@ class Client:
         if location:
             params['location'] = location
 
-        if method == 'get':
-            #print(self.base_url)
-            #print(params)
-            r = requests.get("%s"%(self.base_url), params=params, timeout=timeout, verify=False)
-        elif method == 'post':
-            r = requests.post("%s"%(self.base_url), data=json.dumps(params), headers=self._headers, timeout=timeout, verify=False)
-        else:
-            raise RuntimeError("Unknown method '%s'"%(method))
+        return params
+
+    def _get_response(self, r, latency: float = None):
+        """Given the HTTP response of the bot, returns a Response instance,
+           or raises an exception if the bot returned an error
+        """
+        if r.status_code in OVERLOAD_CODES:
+            # The body of an overloaded bot, or of its gateway, is often not JSON
+            raise ChatbotServerError(r.status_code, r.content.decode('utf-8', 'replace'))
+        return self._decode_response(r.content, latency)
+
+    def _decode_response(self, raw: bytes, latency: float = None):
+        """Given the body of the response of the bot, returns a Response instance,
+           or raises an exception if the bot returned an error
+        """
         try:
             # Inner import to avoid cyclic include
             from . import Response
-            #print(r)
-            return Response(self, self.__process_response(r.json()))
-        except json.decoder.JSONDecodeError:
-            raise RuntimeError("Invalid response : %s"%(r.text))
+            return Response.from_bytes(self, raw, self.__process_response(codec.loads(raw)), latency=latency)
+        except ValueError:
+            raise RuntimeError("Invalid response : %s"%(raw.decode('utf-8', 'replace')))
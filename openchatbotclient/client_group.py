@@ -4,38 +4,202 @@ A client group is a list of clients. This may be used to send a given
 user query to a number of bots and retrieve all results, typically
 to get the higher rank answer, or to compare the various performances, etc.
 
+By default, the bots are queried one after the other. In concurrent mode,
+all the bots are queried in parallel, so that the group answers as soon
+as the slowest bot does:
+
+    responses = bots.ask("amedee", "hello", concurrent=True, deadline=2.0)
+
+The health of each bot is tracked by its client (see the health module),
+from the time it is added to a group. The healthiest bots are queried
+first, and the bots that are down are not waited for: their circuit opens,
+and they are reported as CircuitOpenError until they are probed again.
+
 Authors:
     - Amédée Potier (amedee.potier@konverso.ai) from Konverso
 
 History:
     - 2020/11/02: Amédée: Initial class implementation
+    - 2026/10/18: Adding the concurrent mode, with deadline and timeout
+    - 2026/10/18: Adding the hooks, see the metrics module
+    - 2026/10/18: The healthiest bots are queried first, with a default timeout
+    - 2026/10/18: Adding the ranker, see the ranking module
+    - 2026/10/18: The health of the clients is enabled by the group
 """
 
+import time
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
 from .client import Client
+from .exception import DeadlineExceededError
+from .metrics import GroupCallRecord
+from .response import ErrorRecord
 from .response_group import ResponseGroup
 
+# Timeout in seconds of each bot query, when neither a timeout nor a deadline is given
+TIMEOUT_DEFAULT = 30
+
 class ClientGroup(list):
 
+    def __init__(self, *args):
+        super().__init__(*args)
+
+        # Hooks notified of each group query, and of the queries of the clients
+        self.hooks = []
+
+        for client in self:
+            client.track_health()
+
     def append(self, client):
         assert isinstance(client, Client)
         super().append(client)
+        client.track_health()
+        for hook in self.hooks:
+            client.add_hook(hook)
+
+    def add_hook(self, hook):
+        """Add a Hook instance, notified of each group query, and installed
+           on all the clients of the group to be notified of their queries
+        """
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+        for client in self:
+            client.add_hook(hook)
 
-    def ask(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get'):
+    def ask(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+            timeout=None, concurrent: bool = False, workers: int = None, deadline: float = None,
+            strategy=None, ranker=None):
         """Invoke request to each of the bots in the group
-           and returns an aggregated answer. Not that errors are ignored...
+           and returns an aggregated answer. Note that errors do not stop
+           the queries to the other bots...
            The result is a simple list of the valid JSON received.
 
-           Returns an instance of response_group
+           Optional parameters:
+            - timeout: the timeout in seconds of each bot query. Defaults to
+                       TIMEOUT_DEFAULT, unless a deadline is given
+            - concurrent: if True, all the bots are queried in parallel
+            - workers: the number of parallel queries in concurrent mode.
+                       Default is the number of bots in the group
+            - deadline: the maximum time in seconds for the whole group. Bots that
+                        did not answer by then are reported as errors
+            - strategy: a Strategy instance (see the strategy module) deciding when
+                        the group has enough answers. The queries no longer needed
+                        are abandoned. A strategy implies the concurrent mode
+            - ranker: a Ranker instance (see the ranking module) given each response
+                      as soon as it is received, with the index of its bot in the group
+
+           Returns an instance of response_group. The bots that failed to answer are
+           available as ErrorRecord instances in its "errors" attribute.
         """
 
+        kwargs = dict(userId=userId, query=query, lang=lang, location=location, method=method)
+
+        if deadline is None and strategy is not None:
+            deadline = strategy.deadline
+
+        if timeout is None and deadline is None:
+            timeout = TIMEOUT_DEFAULT
+
+        start = time.perf_counter()
+        end = start + deadline if deadline is not None else None
+
+        order = self._get_dispatch_order()
+        if (concurrent or strategy is not None) and self:
+            results = self._ask_concurrent(kwargs, timeout, workers, deadline, end, strategy, order, ranker)
+        else:
+            # Query the healthiest bots first, but keep the results in the order of the group
+            results = [None] * len(self)
+            for index in order:
+                results[index] = result = _ask_client(self[index], kwargs, timeout, deadline, end)
+                if ranker is not None and not isinstance(result, ErrorRecord):
+                    ranker.add(result, index)
+
+        if strategy is None:
+            responses = [result for result in results if not isinstance(result, ErrorRecord)]
+        else:
+            responses = strategy.select(self, results)
+
         json_result_list = ResponseGroup()
+        for response in responses:
+            json_result_list.append(response)
+        for result in results:
+            if isinstance(result, ErrorRecord):
+                json_result_list.add_error(result)
 
-        for client in self:
-            try:
-                json_result = client.ask(userId=userId, query=query, lang=lang, location=location, method=method)
-            except Exception as e:
-                print("Got error sending request to %s (API '%s'): %s" % (client, client.base_url, e))
-            else:
-                json_result_list.append(json_result)
+        if self.hooks:
+            record = GroupCallRecord(self, time.perf_counter() - start,
+                                     len(json_result_list), len(json_result_list.errors))
+            for hook in self.hooks:
+                hook.on_group_call(record)
 
         return json_result_list
+
+    def _get_dispatch_order(self):
+        """returns the indexes of the clients, the healthiest first"""
+        def rank(index):
+            health = self[index].health
+            return health.get_rank() if health is not None else (0, 0.0, 0)
+        return sorted(range(len(self)), key=rank)
+
+    def _ask_concurrent(self, kwargs, timeout, workers, deadline, end, strategy, order, ranker=None):
+        """Query all the bots in parallel, and returns their results. Without
+           strategy, the results are in the order of the group, otherwise in
+           the order they were received. The queries are submitted in the
+           given order of the clients, which matters when there are fewer
+           workers than clients.
+        """
+        start = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=workers or len(self))
+        futures = {executor.submit(_ask_client, self[index], kwargs, timeout, deadline, end): index
+                   for index in order}
+        pending = set(futures)
+
+        # Pairs of (index of the client in the group, result)
+        results = []
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                pending.discard(future)
+                result = future.result()
+                results.append((futures[future], result))
+                if ranker is not None and not isinstance(result, ErrorRecord):
+                    ranker.add(result, futures[future])
+                if strategy is not None and strategy.is_complete(self, [r for _, r in results]):
+                    break
+        except TimeoutError:
+            for future in pending:
+                index = futures[future]
+                if future.done():
+                    results.append((index, future.result()))
+                else:
+                    error = DeadlineExceededError(deadline)
+                    results.append((index, ErrorRecord(self[index], error, time.perf_counter() - start)))
+            pending = ()
+
+        # Do not wait for the bots that are late or no longer needed, their answer will be dropped
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+        if strategy is None:
+            results.sort(key=lambda item: item[0])
+        return [result for _, result in results]
+
+
+def _ask_client(client, kwargs, timeout=None, deadline=None, end=None):
+    """Query a single client, and returns either its Response, or an ErrorRecord.
+       end is the time at which the group deadline expires, if any.
+    """
+    start = time.perf_counter()
+
+    if end is not None:
+        remaining = end - start
+        if remaining <= 0:
+            return ErrorRecord(client, DeadlineExceededError(deadline), 0)
+        timeout = min(timeout, remaining) if timeout else remaining
+
+    try:
+        return client.ask(timeout=timeout, **kwargs)
+    except Exception as e:
+        return ErrorRecord(client, e, time.perf_counter() - start)
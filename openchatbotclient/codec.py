@@ -0,0 +1,126 @@
+"""JSON codec of the Open Chat Bot client.
+
+All the JSON encoded or decoded by the package (the queries sent to the bots,
+their responses, the descriptors) goes through this module. It uses the
+fastest JSON library installed, in this order of preference:
+    - orjson
+    - msgspec
+    - ujson
+    - json, from the standard library
+
+Documents are encoded to bytes, and may be decoded from bytes, so that the
+content of HTTP requests and responses is never converted to str.
+
+    from openchatbotclient import codec
+    content = codec.dumps({'userId': 'amedee', 'query': 'hello'})
+    data = codec.loads(content)
+
+The codec may also be chosen explicitly:
+    codec.set_codec('json')
+
+Whatever the library, an invalid document raises a ValueError.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
+
+
+class Codec:
+    def __init__(self, name: str, dumps, loads):
+        """Create a codec. The constructor parameters are:
+           - name: the name of the codec
+           - dumps: a function encoding an object to JSON bytes
+           - loads: a function decoding JSON bytes or str, raising a
+                    ValueError for invalid content
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __str__(self):
+        return "codec('%s')" % self.name
+
+
+def _get_orjson():
+    import orjson
+    return Codec('orjson', orjson.dumps, orjson.loads)
+
+
+def _get_msgspec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def loads(content):
+        try:
+            return decoder.decode(content)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e))
+
+    return Codec('msgspec', encoder.encode, loads)
+
+
+def _get_ujson():
+    import ujson
+
+    def dumps(data):
+        return ujson.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    return Codec('ujson', dumps, ujson.loads)
+
+
+def _get_json():
+    import json
+
+    def dumps(data):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    return Codec('json', dumps, json.loads)
+
+
+# The available codecs, in order of preference
+CODECS = {
+    'orjson': _get_orjson,
+    'msgspec': _get_msgspec,
+    'ujson': _get_ujson,
+    'json': _get_json,
+}
+
+_codec = None
+
+
+def get_codec() -> Codec:
+    """returns the codec in use, choosing it on first call"""
+    global _codec
+    if _codec is None:
+        for get in CODECS.values():
+            try:
+                _codec = get()
+                break
+            except ImportError:
+                pass
+    return _codec
+
+
+def set_codec(codec):
+    """Choose the codec to use, given either its name, or a Codec instance.
+       Raises an ImportError if the library of the codec is not installed
+    """
+    global _codec
+    if not isinstance(codec, Codec):
+        codec = CODECS[codec]()
+    _codec = codec
+
+
+def dumps(data) -> bytes:
+    """Encode data to JSON bytes"""
+    return get_codec().dumps(data)
+
+
+def loads(content):
+    """Decode JSON bytes or str. Raises a ValueError for invalid content"""
+    return get_codec().loads(content)
@@ -0,0 +1,56 @@
+"""Concurrency utilities of the Open Chat Bot client.
+
+The imap function calls a function on each item of an iterable from a pool
+of threads, as the builtin map would do:
+
+    for domain, descriptor in imap(repo.get_descriptor, domains, workers=32):
+        print(domain, descriptor)
+
+The iterable is consumed lazily: at most "workers" items are in flight at
+any time, so that very long (or infinite) iterables run in constant memory.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
+
+import itertools
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def imap(function, iterable, workers: int, ordered: bool = False):
+    """Calls function on each item of the iterable, using a pool of threads,
+       and yields (item, result) pairs.
+
+       - workers: the number of items processed in parallel
+       - ordered: if True, the pairs are yielded in the order of the iterable.
+                  Otherwise they are yielded as soon as they complete
+
+       An exception raised by the function is raised when its pair is reached.
+    """
+    assert workers > 0
+    iterator = iter(iterable)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            pending = deque((item, executor.submit(function, item))
+                            for item in itertools.islice(iterator, workers))
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for next_item in itertools.islice(iterator, 1):
+                    pending.append((next_item, executor.submit(function, next_item)))
+                yield item, result
+        else:
+            pending = {executor.submit(function, item): item
+                       for item in itertools.islice(iterator, workers)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for next_item in itertools.islice(iterator, len(done)):
+                    pending[executor.submit(function, next_item)] = next_item
+                for future in done:
+                    yield pending.pop(future), future.result()
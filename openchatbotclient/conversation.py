@@ -0,0 +1,292 @@
+"""Conversations with a bot.
+
+A conversation is a sequence of queries of one user to one bot. It keeps
+the defaults of the user (language, location, method), the context
+returned by the bot in its last response, and the timings of each turn.
+The queries of a conversation are sent over its own keep-alive connection,
+so that a long conversation only pays the TCP and TLS handshakes once:
+
+    from openchatbotclient import Client
+
+    client = Client('https://callbot.konverso.ai', 443)
+    with client.session("amedee", lang="en") as conversation:
+        conversation.ask("hello")
+        response = conversation.ask("I want to talk with an operator")
+        print(conversation.context)
+        print(conversation.get_stats())
+
+With send_context=True, the context returned by the bot is sent back with
+the next POST query, for bots that do not keep it themselves.
+
+The queries of a conversation bypass the response cache and the single-flight
+mode of the client, as they depend on the previous ones. They still share
+its health, hedging policy, limiter and hooks. When the client hedges its
+queries, the transport of the conversation keeps a second connection for
+the hedged duplicates.
+
+A BalancedClient routes each query to one of its replicas, over their own
+transports: it has no conversations, which are opened with one replica.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The connection of a conversation speaks HTTP/2 when the client does
+    - 2026/10/18: A second connection is kept for the hedged queries
+    - 2026/10/18: The balanced clients are rejected
+"""
+
+import copy
+import sys
+import time
+
+from .metrics import Hook
+
+# Number of turns kept in the history of a conversation
+MAX_TURNS_DEFAULT = 1000
+
+
+class Turn:
+    """One query of a conversation, with its response or error. The durations
+       are in seconds, see CallRecord: connect and tls are 0 when the
+       connection of the conversation was reused.
+    """
+
+    __slots__ = ('index', 'query', 'response', 'error', 'latency', 'connect', 'tls', 'ttfb',
+                 'request_size', 'response_size')
+
+    def __init__(self, index: int, query: str):
+        self.index = index
+        self.query = query
+        self.response = None
+        self.error = None
+        self.latency = None
+        self.connect = 0
+        self.tls = 0
+        self.ttfb = None
+        self.request_size = 0
+        self.response_size = 0
+
+    def __str__(self):
+        return 'turn(%d: %s => %s in %.3fs)' % (self.index, self.query,
+                                               self.error or (self.response and self.response.text),
+                                               self.latency or 0)
+
+
+class _TurnHook(Hook):
+    """Keeps the record of the last query sent by a conversation"""
+
+    def __init__(self):
+        self.record = None
+
+    def on_call(self, record):
+        self.record = record
+
+
+class Conversation:
+
+    def __init__(self, client, userId: str, lang: str = None, location: str = None, method: str = 'get',
+                 timeout=None, send_context: bool = False, transport=None, max_turns: int = MAX_TURNS_DEFAULT):
+        """Create a conversation, usually with client.session. The constructor parameters are:
+           - client: the Client of the bot
+           - userId: the identifier of the user
+           - lang, location, method, timeout: the defaults of the queries
+           - send_context: if True, the context returned by the bot is sent
+                           back with the next POST query
+           - transport: optional, the transport of the queries. By default the
+                        conversation creates and owns a transport keeping one
+                        connection alive, and a second one for the hedged
+                        queries if the client hedges
+           - max_turns: the number of turns kept in the history
+        """
+        if not userId:
+            raise RuntimeError("userId is empty")
+        # The module is not imported when no balanced client was created
+        balanced_client = sys.modules.get(__package__ + '.balanced_client')
+        if balanced_client is not None and isinstance(client, balanced_client._Balancer):
+            raise RuntimeError("A conversation is opened with one replica of %s" % client)
+        self.client = client
+        self.user_id = userId
+        self.lang = lang
+        self.location = location
+        self.method = method
+        self.timeout = timeout
+        self.send_context = send_context
+        self.max_turns = max_turns
+
+        # The context returned by the bot in its last response
+        self.context = None
+        self.turns = []
+        self.count = 0
+
+        self._owns_transport = transport is None
+        self._hook = _TurnHook()
+        self._client = self._bind(client, transport or self._create_transport())
+
+    def __str__(self):
+        return 'conversation(%s with %s, %d turns)' % (self.user_id, self.client, self.count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_max_connections(self) -> int:
+        # A hedged duplicate must not wait for the connection of the query it hedges
+        return 1 if self.client.hedging is None else 2
+
+    def _create_transport(self):
+        from .transport import Http2Transport, Transport
+        verify = getattr(self.client.transport, 'verify', False)
+        connections = self._get_max_connections()
+        if isinstance(self.client.transport, Http2Transport):
+            return Http2Transport(max_connections=connections, max_keepalive_connections=connections,
+                                  verify=verify)
+        return Transport(pool_connections=1, pool_maxsize=connections, pool_block=True, verify=verify)
+
+    def _bind(self, client, transport):
+        """returns a copy of the client sending its queries over the transport,
+           and notifying the hook of the conversation
+        """
+        bound = copy.copy(client)
+        bound.transport = transport
+        bound._owns_transport = False
+        bound.hooks = list(client.hooks) + [self._hook]
+        return bound
+
+    @property
+    def transport(self):
+        return self._client.transport
+
+    def close(self):
+        """Close the connection of the conversation, unless its transport was given"""
+        if self._owns_transport:
+            self.transport.close()
+
+    def _get_params(self, query: str, lang: str = None, location: str = None, method: str = None) -> dict:
+        params = self._client._get_params(self.user_id, query, lang or self.lang, location or self.location)
+        if self.send_context and self.context and method == 'post':
+            params['context'] = self.context
+        return params
+
+    def _start_turn(self, query: str) -> Turn:
+        self._hook.record = None
+        turn = Turn(self.count, query)
+        self.count += 1
+        return turn
+
+    def _end_turn(self, turn: Turn, start: float, response=None, error: Exception = None):
+        turn.latency = time.perf_counter() - start
+        turn.response = response
+        turn.error = error
+        record = self._hook.record
+        if record is not None:
+            turn.connect = record.connect
+            turn.tls = record.tls
+            turn.ttfb = record.ttfb
+            turn.request_size = record.request_size
+            turn.response_size = record.response_size
+        if response is not None:
+            self.context = response.context
+
+        self.turns.append(turn)
+        if len(self.turns) > self.max_turns:
+            del self.turns[0]
+
+    def ask(self, query: str, lang: str = None, location: str = None, method: str = None, timeout=None):
+        """Send the next query of the user, and returns the Response of the bot.
+           The parameters default to the ones of the conversation
+        """
+        method = method or self.method
+        params = self._get_params(query, lang, location, method)
+        turn = self._start_turn(query)
+        start = time.perf_counter()
+        try:
+            response = self._client._ask(params, method, timeout if timeout is not None else self.timeout)
+        except Exception as e:
+            self._end_turn(turn, start, error=e)
+            raise
+        self._end_turn(turn, start, response)
+        return response
+
+    def get_stats(self) -> dict:
+        """returns the statistics of the turns kept in the history: their
+           number, errors, latencies, and the time spent opening connections
+        """
+        latencies = sorted(turn.latency for turn in self.turns if turn.error is None)
+        return {
+            'turns': len(self.turns),
+            'errors': sum(turn.error is not None for turn in self.turns),
+            'connections': sum(turn.connect > 0 for turn in self.turns),
+            'setup': sum(turn.connect + turn.tls for turn in self.turns),
+            'latency_mean': sum(latencies) / len(latencies) if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+
+class AsyncConversation(Conversation):
+    """A conversation with an AsyncClient. Its ask method is a coroutine"""
+
+    def _create_transport(self):
+        from .transport import AsyncTransport
+        http2 = getattr(self.client.transport, 'http2', False)
+        connections = self._get_max_connections()
+        return AsyncTransport(max_connections=connections, max_keepalive_connections=connections, http2=http2)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def close(self):
+        raise RuntimeError("An AsyncConversation is closed with aclose")
+
+    async def aclose(self):
+        """Close the connection of the conversation, unless its transport was given"""
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    async def ask(self, query: str, lang: str = None, location: str = None, method: str = None, timeout=None):
+        """Send the next query of the user, and returns the Response of the bot.
+           The parameters default to the ones of the conversation
+        """
+        method = method or self.method
+        params = self._get_params(query, lang, location, method)
+        turn = self._start_turn(query)
+        start = time.perf_counter()
+        try:
+            response = await self._client._ask(params, method, timeout if timeout is not None else self.timeout)
+        except Exception as e:
+            self._end_turn(turn, start, error=e)
+            raise
+        self._end_turn(turn, start, response)
+        return response
+
+
+#
+# Sample code, comparing a conversation with queries sent by clients that do
+# not share their connections, against a local stub server.
+#
+if __name__ == '__main__':
+    from openchatbotclient.client import Client
+    from openchatbotclient.stub import StubProcess
+
+    turns = 50
+
+    with StubProcess() as server:
+        start = time.perf_counter()
+        for i in range(turns):
+            with Client(server.host, server.port) as client:
+                client.ask("john", "message %d" % i)
+        print("New connection per message: %.2fms per turn" % ((time.perf_counter() - start) * 1000 / turns))
+
+        client = Client(server.host, server.port)
+        with client.session("john", lang="en") as conversation:
+            start = time.perf_counter()
+            for i in range(turns):
+                conversation.ask("message %d" % i)
+            print("Conversation:               %.2fms per turn" % ((time.perf_counter() - start) * 1000 / turns))
+            print(conversation.get_stats())
@@ -0,0 +1,211 @@
+"""A cache of the descriptors retrieved by a repository.
+
+Without a cache, the repository fetches the descriptor of a domain each time
+it is asked for it. With a cache, the descriptor is kept for the time allowed
+by the "Cache-Control" header of the domain, or a default time to live. Once
+expired, the descriptor is revalidated with a conditional request, using its
+"ETag" or "Last-Modified" header, which avoids downloading it again if it
+did not change.
+
+Domains that have no descriptor, or an invalid one, are also kept for a while
+(negative caching), so that they are not queried again on every lookup.
+
+    from openchatbotclient import Repository
+    from openchatbotclient.descriptor_cache import DescriptorCache
+
+    repo = Repository(cache=DescriptorCache(maxsize=1000, path="/tmp/descriptors"))
+
+When given a path, the cache is also stored on disk, so that a restarted
+process starts with the descriptors found by the previous one.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+"""
+
+import dbm
+import threading
+import time
+
+from collections import OrderedDict
+
+from . import codec
+
+from .descriptor import Descriptor
+from .exception import NoChatbotDescriptorError, InvalidChatbotDescriptorError
+
+MAXSIZE_DEFAULT = 1024
+
+# Time to live in seconds of the descriptors, when not given by the domain
+TTL_DEFAULT = 3600
+
+# Time to live in seconds of the domains without a valid descriptor
+NEGATIVE_TTL_DEFAULT = 300
+
+# Whatever the domain says, descriptors are revalidated at least once a day
+MAX_TTL_DEFAULT = 86400
+
+# The errors that may be cached, by name
+ERRORS = {error.__name__: error for error in (NoChatbotDescriptorError, InvalidChatbotDescriptorError)}
+
+
+class CacheEntry:
+    """The cached result of a descriptor lookup: either a descriptor, or
+       the name of the error raised when looking it up
+    """
+
+    __slots__ = ('descriptor', 'error', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, descriptor: dict = None, error: str = None, expires: float = 0,
+                 etag: str = None, last_modified: str = None):
+        self.descriptor = descriptor
+        self.error = error
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def get_descriptor(self) -> Descriptor:
+        """returns a copy of the cached descriptor, or raises the cached error"""
+        if self.error:
+            raise ERRORS[self.error]()
+        # Descriptors are mutable: never share the cached one
+        return Descriptor(codec.loads(codec.dumps(self.descriptor)))
+
+    def get_validators(self) -> dict:
+        """returns the headers of a conditional request revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_json(self) -> bytes:
+        return codec.dumps({name: getattr(self, name) for name in self.__slots__})
+
+    @classmethod
+    def from_json(cls, content):
+        return cls(**codec.loads(content))
+
+
+class DescriptorCache:
+
+    def __init__(self, maxsize: int = MAXSIZE_DEFAULT, ttl: float = TTL_DEFAULT,
+                 negative_ttl: float = NEGATIVE_TTL_DEFAULT, max_ttl: float = MAX_TTL_DEFAULT,
+                 path: str = None):
+        """Create a descriptor cache. The constructor parameters are:
+           - maxsize: the number of domains kept in memory. The least recently
+                      used domains are evicted first
+           - ttl: the time to live in seconds of the descriptors, when the domain
+                  does not give one with a "Cache-Control: max-age" header
+           - negative_ttl: the time to live in seconds of the domains that have
+                           no valid descriptor
+           - max_ttl: the maximum time to live in seconds of any descriptor
+           - path: optional, the path of a file storing the cache on disk
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self.path = path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = dbm.open(path, 'c') if path else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, domain: str) -> CacheEntry:
+        """returns the entry of the domain, fresh or not, or None if unknown"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is not None:
+                self._entries.move_to_end(domain)
+                return entry
+
+            if self._store is not None:
+                content = self._store.get(domain)
+                if content is not None:
+                    entry = CacheEntry.from_json(content)
+                    self._set(domain, entry, store=False)
+            return entry
+
+    def put(self, domain: str, descriptor: Descriptor, headers=None):
+        """Cache the descriptor of a domain, for the time allowed by the
+           HTTP headers of its response
+        """
+        headers = headers or {}
+        ttl = self.get_ttl(headers)
+        if ttl is None:
+            # no-store
+            return
+        # The caller keeps the descriptor, and may modify it
+        entry = CacheEntry(descriptor=codec.loads(codec.dumps(descriptor)),
+                           expires=time.time() + ttl,
+                           etag=headers.get('ETag'),
+                           last_modified=headers.get('Last-Modified'))
+        with self._lock:
+            self._set(domain, entry)
+
+    def put_error(self, domain: str, error: Exception):
+        """Cache the error raised when looking up the descriptor of a domain"""
+        name = type(error).__name__
+        assert name in ERRORS
+        entry = CacheEntry(error=name, expires=time.time() + self.negative_ttl)
+        with self._lock:
+            self._set(domain, entry)
+
+    def refresh(self, domain: str, entry: CacheEntry, headers=None):
+        """Extend the life of an entry that was revalidated"""
+        ttl = self.get_ttl(headers or {})
+        if ttl is None:
+            ttl = 0
+        entry.expires = time.time() + ttl
+        with self._lock:
+            self._set(domain, entry)
+
+    def get_ttl(self, headers) -> float:
+        """returns the time to live allowed by the Cache-Control header, or
+           None if the response may not be stored
+        """
+        ttl = self.ttl
+        for directive in headers.get('Cache-Control', '').lower().split(','):
+            directive = directive.strip()
+            if directive == 'no-store':
+                return None
+            if directive == 'no-cache':
+                ttl = 0
+            elif directive.startswith('max-age='):
+                try:
+                    ttl = int(directive[len('max-age='):])
+                except ValueError:
+                    pass
+        return max(0, min(ttl, self.max_ttl))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._store is not None:
+                for key in list(self._store.keys()):
+                    del self._store[key]
+
+    def close(self):
+        """Close the file storing the cache, if any"""
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+
+    def _set(self, domain, entry, store=True):
+        self._entries[domain] = entry
+        self._entries.move_to_end(domain)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if store and self._store is not None:
+            self._store[domain] = entry.to_json()
@@ -0,0 +1,420 @@
+"""Dispatcher of the queries to a pool of worker processes.
+
+A ClientGroup runs in a single process: when querying dozens of bots at
+high rate, the TLS and JSON work is limited by the GIL to one core. The
+ProcessDispatcher shards the work across worker processes, each one with
+its own clients and pooled transport, and returns the familiar
+ResponseGroup:
+
+    from openchatbotclient.dispatcher import ProcessDispatcher
+
+    with ProcessDispatcher(bots, processes=4) as dispatcher:
+        responses = dispatcher.ask("amedee", "hello", deadline=2.0)
+        for responses in dispatcher.ask_many(queries):
+            print(responses.get_first())
+
+The work is sharded either:
+    - by clients (the default): each process queries a subset of the bots,
+      and a group query is sent to all the processes
+    - by users: each process queries all the bots, and the queries of a given
+      user always go to the same process. This suits many concurrent
+      conversations with a few bots.
+
+The clients are sent to the workers as (host, port, path) specifications,
+and the responses are sent back over a pipe per worker as compact tuples of their fields and raw
+content (see Response.to_tuple): they are not decoded again by the caller.
+The errors are sent back as their type and message, and raised again as
+the same exception for the errors of this package, or as RemoteError.
+
+The workers create plain clients from these specifications: the descriptor,
+hooks, cache, single-flight, hedging policy and limiter of the clients are not
+used by the workers, and each worker tracks the health of its own clients.
+
+When a worker process stops unexpectedly (killed, out of memory...), the
+group queries it did not answer fail with a WorkerError, as do the next
+ones it should answer. A group query with a deadline fails with a
+DeadlineExceededError if its results are not received shortly after it.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: Detect the workers that stopped, and wait for the deadline only
+"""
+
+import functools
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+import zlib
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+from .client import Client
+from .client_group import TIMEOUT_DEFAULT, _ask_client
+from .exception import (ChatbotServerError, CircuitOpenError, DeadlineExceededError, RateLimitError, RemoteError,
+                        WorkerError)
+from .response import ErrorRecord, Response
+from .response_group import ResponseGroup
+from .transport import Transport
+
+# Number of queries sent in parallel by each worker process
+THREADS_DEFAULT = 64
+
+# Number of group queries in flight in ask_many
+WINDOW_DEFAULT = 256
+
+# Time in seconds given to the workers to send the results of a group query
+# after its deadline
+DEADLINE_MARGIN = 1.0
+
+SHARD_BY_CLIENTS = 'clients'
+SHARD_BY_USERS = 'users'
+
+
+class ProcessDispatcher:
+
+    def __init__(self, clients, processes: int = None, shard_by: str = SHARD_BY_CLIENTS,
+                 threads: int = THREADS_DEFAULT):
+        """Create a dispatcher, and start its worker processes. The constructor parameters are:
+           - clients: the clients to query, such as a ClientGroup
+           - processes: the number of worker processes. Default is the number of cores
+           - shard_by: either 'clients' or 'users', see above
+           - threads: the number of queries sent in parallel by each process
+        """
+        self.clients = list(clients)
+        for client in self.clients:
+            if type(client) is not Client:
+                raise TypeError("Only Client instances may be dispatched, not %s" % type(client).__name__)
+        if shard_by not in (SHARD_BY_CLIENTS, SHARD_BY_USERS):
+            raise ValueError("Unknown sharding '%s'" % shard_by)
+
+        self.shard_by = shard_by
+        processes = processes or os.cpu_count() or 1
+        if shard_by == SHARD_BY_CLIENTS:
+            processes = max(1, min(processes, len(self.clients)))
+
+        # The specifications of the clients of each process, with their index in the group
+        specs = [(index, client.host, client.port, client.api_path) for index, client in enumerate(self.clients)]
+        if shard_by == SHARD_BY_CLIENTS:
+            shards = [specs[i::processes] for i in range(processes)]
+        else:
+            shards = [specs] * processes
+        self._sizes = [len(shard) for shard in shards]
+
+        # Each worker has its own queue of tasks and pipe of results, so
+        # that a worker that stops unexpectedly does not block the others
+        context = multiprocessing.get_context()
+        self._queues = []
+        self._connections = []
+        self._processes = []
+        for shard in shards:
+            queue = context.Queue()
+            connection, results = context.Pipe(duplex=False)
+            process = context.Process(target=_run_worker, args=(shard, queue, results, threads), daemon=True)
+            process.start()
+            results.close()
+            self._queues.append(queue)
+            self._connections.append(connection)
+            self._processes.append(process)
+
+        # The group queries in flight: [future, answers expected, results, processes] by id
+        self._pending = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        # The WorkerError of each process that stopped unexpectedly
+        self._dead = {}
+
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    def __str__(self):
+        return "process_dispatcher(%d clients, %d processes)" % (len(self.clients), len(self._processes))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._closed:
+            return
+        self._closed = True
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            process.join()
+        # The reader stops once all the pipes are closed
+        self._reader.join()
+        for connection in self._connections:
+            connection.close()
+
+    def submit(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+               timeout=None, deadline: float = None) -> Future:
+        """Send a query to all the bots, and returns a Future of its ResponseGroup.
+           The parameters are the same as for ClientGroup.ask. The future fails
+           with a WorkerError if a worker process stopped before answering.
+        """
+        return self._submit(userId, query, lang=lang, location=location, method=method,
+                            timeout=timeout, deadline=deadline)[1]
+
+    def _submit(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+                timeout=None, deadline: float = None):
+        """returns the id and the future of a new group query"""
+        if self._closed:
+            raise RuntimeError("Dispatcher is closed")
+        if timeout is None and deadline is None:
+            timeout = TIMEOUT_DEFAULT
+
+        kwargs = dict(userId=userId, query=query, lang=lang, location=location, method=method)
+        if self.shard_by == SHARD_BY_CLIENTS:
+            targets = range(len(self._queues))
+        else:
+            targets = [zlib.crc32(userId.encode('utf-8')) % len(self._queues)]
+
+        future = Future()
+        request_id = next(self._ids)
+        with self._lock:
+            for target in targets:
+                if target in self._dead:
+                    future.set_exception(self._dead[target])
+                    return request_id, future
+            self._pending[request_id] = [future, sum(self._sizes[target] for target in targets), [], targets]
+        for target in targets:
+            self._queues[target].put((request_id, kwargs, timeout, deadline))
+        return request_id, future
+
+    def _wait(self, request_id: int, future: Future, deadline: float = None, end: float = None) -> ResponseGroup:
+        """returns the ResponseGroup of a group query, waiting at most until end
+           when the query has a deadline
+        """
+        if end is None:
+            return future.result()
+        try:
+            return future.result(max(0.0, end - time.perf_counter()))
+        except TimeoutError:
+            with self._lock:
+                abandoned = self._pending.pop(request_id, None) is not None
+            if not abandoned:
+                # The results were received in the meantime
+                return future.result()
+            future.cancel()
+            raise DeadlineExceededError(deadline)
+
+    def ask(self, userId: str, query: str, lang: str = None, location: str = None, method: str = 'get',
+            timeout=None, deadline: float = None) -> ResponseGroup:
+        """Invoke request to each of the bots, and returns a ResponseGroup.
+           The parameters are the same as for ClientGroup.ask
+        """
+        end = time.perf_counter() + deadline + DEADLINE_MARGIN if deadline is not None else None
+        request_id, future = self._submit(userId, query, lang=lang, location=location, method=method,
+                                          timeout=timeout, deadline=deadline)
+        return self._wait(request_id, future, deadline, end)
+
+    def ask_many(self, queries, window: int = WINDOW_DEFAULT, lang: str = None, location: str = None,
+                 method: str = 'get', timeout=None, deadline: float = None):
+        """Invoke many group queries, and yields their ResponseGroup in the order
+           of the queries. The queries are (userId, query) pairs, or dicts with
+           the parameters of ask. At most window queries are in flight.
+        """
+        defaults = dict(lang=lang, location=location, method=method, timeout=timeout, deadline=deadline)
+        iterator = iter(queries)
+
+        def submit(item):
+            kwargs = Client._get_query_kwargs(item, defaults)
+            deadline = kwargs['deadline']
+            end = time.perf_counter() + deadline + DEADLINE_MARGIN if deadline is not None else None
+            return self._submit(**kwargs) + (deadline, end)
+
+        pending = deque(submit(item) for item in itertools.islice(iterator, window))
+        while pending:
+            responses = self._wait(*pending.popleft())
+            for item in itertools.islice(iterator, 1):
+                pending.append(submit(item))
+            yield responses
+
+    def _read_results(self):
+        """Receive the results of the workers, and complete the group queries.
+           The end of a worker process is noticed as soon as it happens.
+        """
+        connections = {connection: target for target, connection in enumerate(self._connections)}
+        sentinels = {process.sentinel: target for target, process in enumerate(self._processes)}
+        while connections or sentinels:
+            for ready in multiprocessing.connection.wait(list(connections) + list(sentinels)):
+                if ready in connections:
+                    if not self._receive(ready):
+                        del connections[ready]
+                elif ready in sentinels:
+                    target = sentinels.pop(ready)
+                    # The last results sent by the worker are received first
+                    connection = self._connections[target]
+                    while connection in connections and connection.poll():
+                        if not self._receive(connection):
+                            del connections[connection]
+                    self._stopped(target)
+
+    def _receive(self, connection) -> bool:
+        """Receive the results of a worker for a group query. returns False
+           once its pipe is closed
+        """
+        try:
+            request_id, results = connection.recv()
+        except (EOFError, OSError):
+            return False
+        with self._lock:
+            # The query may have been abandoned at its deadline
+            entry = self._pending.get(request_id)
+            if entry is None:
+                return True
+            entry[2].extend(results)
+            entry[1] -= len(results)
+            if entry[1] > 0:
+                return True
+            del self._pending[request_id]
+        future, _, results, _ = entry
+        try:
+            future.set_result(self._get_response_group(results))
+        except Exception as e:
+            future.set_exception(e)
+        return True
+
+    def _stopped(self, target: int):
+        """Fail the group queries of a worker process that stopped, unless
+           the dispatcher is closed
+        """
+        if self._closed:
+            return
+        process = self._processes[target]
+        process.join()
+        error = WorkerError(process.pid, process.exitcode)
+        failed = []
+        with self._lock:
+            self._dead[target] = error
+            for request_id, entry in list(self._pending.items()):
+                if target in entry[3]:
+                    del self._pending[request_id]
+                    failed.append(entry[0])
+        for future in failed:
+            future.set_exception(error)
+
+    def _get_response_group(self, results) -> ResponseGroup:
+        results.sort(key=lambda result: result[0])
+        responses = ResponseGroup()
+        for index, values, error in results:
+            client = self.clients[index]
+            if error is None:
+                responses.append(Response.from_tuple(client, values))
+            else:
+                latency, packed = error
+                responses.add_error(ErrorRecord(client, _unpack_error(packed), latency))
+        return responses
+
+
+def _pack_error(error: Exception) -> tuple:
+    """returns a compact, picklable description of an exception"""
+    if isinstance(error, ChatbotServerError):
+        return ('ChatbotServerError', error.status, error.description)
+    if isinstance(error, DeadlineExceededError):
+        return ('DeadlineExceededError', error.deadline)
+    if isinstance(error, CircuitOpenError):
+        return ('CircuitOpenError', error.url, error.retry_after)
+    if isinstance(error, RateLimitError):
+        return ('RateLimitError', error.url, error.timeout)
+    return ('RemoteError', type(error).__name__, str(error))
+
+
+def _unpack_error(packed: tuple) -> Exception:
+    name, arguments = packed[0], packed[1:]
+    error_class = {
+        'ChatbotServerError': ChatbotServerError,
+        'DeadlineExceededError': DeadlineExceededError,
+        'CircuitOpenError': CircuitOpenError,
+        'RateLimitError': RateLimitError,
+    }.get(name, RemoteError)
+    return error_class(*arguments)
+
+
+def _run_worker(specs, queue, results, threads: int):
+    """The main function of a worker process: queries its clients for each
+       group query received, and sends back their results
+    """
+    transport = Transport(pool_maxsize=threads)
+    clients = [(index, Client(host, port, path, transport=transport)) for index, host, port, path in specs]
+    for _, client in clients:
+        client.track_health()
+    executor = ThreadPoolExecutor(max_workers=threads)
+    lock = threading.Lock()
+    send_lock = threading.Lock()
+
+    def done(request_id, index, state, future):
+        result = future.result()
+        if isinstance(result, ErrorRecord):
+            item = (index, None, (result.latency, _pack_error(result.error)))
+        else:
+            item = (index, result.to_tuple(), None)
+        with lock:
+            state.append(item)
+            if len(state) < len(clients):
+                return
+        with send_lock:
+            results.send((request_id, state))
+
+    try:
+        while True:
+            task = queue.get()
+            if task is None:
+                break
+            request_id, kwargs, timeout, deadline = task
+            end = time.perf_counter() + deadline if deadline is not None else None
+            state = []
+            for index, client in clients:
+                future = executor.submit(_ask_client, client, kwargs, timeout, deadline, end)
+                future.add_done_callback(functools.partial(done, request_id, index, state))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=True)
+        transport.close()
+        results.close()
+
+
+#
+# Sample code, comparing a concurrent ClientGroup with the dispatcher,
+# against local stub servers.
+#
+if __name__ == '__main__':
+    from openchatbotclient.client_group import ClientGroup
+    from openchatbotclient.stub import StubProcess
+
+    bots = 8
+    count = 500
+
+    servers = [StubProcess(latency=0.01).start() for _ in range(bots)]
+    try:
+        group = ClientGroup()
+        for server in servers:
+            group.append(Client(server.host, server.port))
+
+        start = time.perf_counter()
+        for i in range(count):
+            group.ask("john", "hello %d" % i, concurrent=True)
+        elapsed = time.perf_counter() - start
+        print("ClientGroup:       %.1f group queries/s" % (count / elapsed))
+
+        with ProcessDispatcher(group) as dispatcher:
+            start = time.perf_counter()
+            for responses in dispatcher.ask_many(("john", "hello %d" % i) for i in range(count)):
+                pass
+            elapsed = time.perf_counter() - start
+        print("ProcessDispatcher: %.1f group queries/s, %d processes" % (count / elapsed, len(dispatcher._processes)))
+    finally:
+        for server in servers:
+            server.stop()
@@ -12,6 +12,57 @@ class ChatbotServerError(OpenChatbotError):
     def __str__(self):
         return "chatbot_server_error: %s: %s" % (self.status, self.description)
 
+class DeadlineExceededError(OpenChatbotError):
+    """Exception raised when a client did not answer before the deadline of a group query"""
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+
+    def __str__(self):
+        return "deadline_exceeded_error: no answer within %.3fs" % self.deadline
+
+class CircuitOpenError(OpenChatbotError):
+    """Exception raised when a bot is not queried, as too many of its last queries failed"""
+    def __init__(self, url: str, retry_after: float):
+        super().__init__()
+        self.url = url
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return "circuit_open_error: %s is not queried for %.1fs" % (self.url, self.retry_after)
+
+class RateLimitError(OpenChatbotError):
+    """Exception raised when a query could not be sent to a bot within its timeout,
+       because of the rate or concurrency limit of the bot"""
+    def __init__(self, url: str, timeout: float):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+
+    def __str__(self):
+        return "rate_limit_error: %s could not be queried within %ss" % (self.url, self.timeout)
+
+class RemoteError(OpenChatbotError):
+    """Exception raised in a worker process, and received by the dispatcher"""
+    def __init__(self, name: str, message: str):
+        super().__init__()
+        self.name = name
+        self.message = message
+
+    def __str__(self):
+        return "remote_error: %s: %s" % (self.name, self.message)
+
+class WorkerError(OpenChatbotError):
+    """Exception raised when a worker process of a dispatcher stopped, for the
+       group queries it did not answer"""
+    def __init__(self, pid: int, exitcode: int):
+        super().__init__()
+        self.pid = pid
+        self.exitcode = exitcode
+
+    def __str__(self):
+        return "worker_error: worker process %s stopped with exit code %s" % (self.pid, self.exitcode)
+
 #
 # Exception related to the processing of descriptor files
 #
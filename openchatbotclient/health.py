@@ -0,0 +1,175 @@
+"""Health of the bots queried by a client.
+
+A client may track the health of its bot: the error rate of its last queries,
+and the average of its latencies (an exponentially weighted moving average).
+The health is tracked when given to the client, or once the client is added
+to a client group or a balanced client. A standalone client created without
+a Health queries its bot whatever its errors.
+
+The health is also a circuit breaker. When too many of the last queries
+failed, the circuit opens: the queries then fail immediately with a
+CircuitOpenError, without waiting for a bot that is down. After a while,
+the circuit is half-open: one query is sent to probe the bot. If it succeeds
+the circuit closes, otherwise it opens again.
+
+    from openchatbotclient import Client
+    from openchatbotclient.health import Health
+
+    client = Client('https://callbot.konverso.ai', 443,
+                    health=Health(error_threshold=0.5, open_timeout=30))
+    print(client.health)
+
+Client groups query the healthiest bots first, and do not wait for the bots
+whose circuit is open.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: Opt-in for the standalone clients
+    - 2026/10/18: Adding cancel_request, for the queries that were not sent
+"""
+
+import threading
+import time
+
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Number of last queries used to compute the error rate
+WINDOW_DEFAULT = 20
+
+# Minimum number of queries before the circuit may open
+MIN_CALLS_DEFAULT = 10
+
+# Error rate above which the circuit opens
+ERROR_THRESHOLD_DEFAULT = 0.5
+
+# Time in seconds before an open circuit is probed
+OPEN_TIMEOUT_DEFAULT = 30
+
+# Weight of the last latency in the moving average
+ALPHA_DEFAULT = 0.2
+
+
+class Health:
+
+    def __init__(self, window: int = WINDOW_DEFAULT, min_calls: int = MIN_CALLS_DEFAULT,
+                 error_threshold: float = ERROR_THRESHOLD_DEFAULT,
+                 open_timeout: float = OPEN_TIMEOUT_DEFAULT, alpha: float = ALPHA_DEFAULT):
+        """Create the health of a bot. The constructor parameters are:
+           - window: the number of last queries used to compute the error rate
+           - min_calls: the minimum number of queries before the circuit may open
+           - error_threshold: the error rate, from 0 to 1, above which the circuit opens
+           - open_timeout: the time in seconds before an open circuit is probed
+           - alpha: the weight of the last latency in the moving average
+        """
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_timeout = open_timeout
+        self.alpha = alpha
+
+        self.state = CLOSED
+        self.latency = None
+
+        # True for each failed query, False for each success
+        self._outcomes = deque(maxlen=window)
+        self._errors = 0
+        self._opened_at = 0
+        self._probed_at = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        latency = '%.3fs' % self.latency if self.latency is not None else '-'
+        return 'health(%s, errors=%d%%, latency=%s)' % (self.state, self.error_rate * 100, latency)
+
+    @property
+    def error_rate(self) -> float:
+        """The rate of failed queries, from 0 to 1, among the last ones"""
+        return self._errors / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.state == CLOSED
+
+    @property
+    def retry_after(self) -> float:
+        """The time in seconds before the bot is probed, if the circuit is open"""
+        if self.state != OPEN:
+            return 0
+        return max(0, self._opened_at + self.open_timeout - time.monotonic())
+
+    def get_rank(self):
+        """returns a sort key, lower for the healthiest bots"""
+        state = (CLOSED, HALF_OPEN, OPEN).index(self.state)
+        return (state, self.error_rate, self.latency or 0)
+
+    def allow_request(self) -> bool:
+        """returns True if a query may be sent to the bot"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._opened_at + self.open_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._probed_at = now
+                return True
+
+            # Half open: only one probe at a time, unless the probe was lost
+            if now < self._probed_at + self.open_timeout:
+                return False
+            self._probed_at = now
+            return True
+
+    def cancel_request(self):
+        """Cancel a query allowed by allow_request, but not sent. When it was
+           the probe of a half-open circuit, another probe may be sent
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probed_at = time.monotonic() - self.open_timeout
+
+    def record_success(self, latency: float):
+        with self._lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.alpha * (latency - self.latency)
+
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._reset()
+            self._add(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._add(True)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and self.error_rate >= self.error_threshold):
+                self._open()
+
+    def _add(self, failed: bool):
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._errors -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._errors += 1
+
+    def _open(self):
+        # The outcomes are kept, so that the error rate remains visible
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _reset(self):
+        self._outcomes.clear()
+        self._errors = 0
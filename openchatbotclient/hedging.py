@@ -0,0 +1,257 @@
+"""Hedged queries, reducing the tail latency of the bots.
+
+A client with a hedging policy sends a second, identical query to the bot
+when the first one did not answer after a delay. The first answer received
+is returned, and the other query is cancelled:
+
+    from openchatbotclient import Client
+    from openchatbotclient.hedging import HedgingPolicy
+
+    client = Client('https://callbot.konverso.ai', 443, hedging=HedgingPolicy(budget=0.05))
+
+The delay is either fixed, or the observed 95th percentile of the latency
+of the bot, so that only the slowest queries are hedged. A policy shared by
+several clients observes the latency of each bot separately. The budget caps
+the extra load sent to the bot, as a ratio of the queries: 0.05 means at
+most 5% more queries.
+
+Only the queries whose method is safe to send twice are hedged, by default
+GET: a query sent with POST may have an effect on the bot side.
+
+A synchronous query that may be hedged runs in a thread of the policy, so
+that the caller can wait for it with the delay. The queries that cannot be
+hedged, because the budget is spent or all the threads are busy, run in the
+thread of the caller. A synchronous query that is already running cannot be
+interrupted: the losing query is abandoned, and its response dropped when it
+arrives. The queries of the AsyncClient are really cancelled.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The latency is observed per bot, and the queries that cannot be
+                  hedged run in the thread of the caller
+    - 2026/10/18: Only the latency of the first query is observed, not the hedged ones
+"""
+
+import asyncio
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .metrics import CallRecord, Histogram
+
+# Ratio of extra queries allowed
+BUDGET_DEFAULT = 0.05
+
+# Number of latencies observed before the delay is derived from them
+MIN_SAMPLES_DEFAULT = 20
+
+# Number of threads running the hedged synchronous queries
+WORKERS_DEFAULT = 32
+
+
+class HedgingPolicy:
+
+    def __init__(self, delay: float = None, percentile: float = 95, budget: float = BUDGET_DEFAULT,
+                 methods=('get',), min_samples: int = MIN_SAMPLES_DEFAULT, workers: int = WORKERS_DEFAULT):
+        """Create a hedging policy. The constructor parameters are:
+           - delay: optional, the fixed delay in seconds before a query is hedged.
+                    By default it is the observed percentile of the latency
+           - percentile: the percentile of the latency used as delay
+           - budget: the maximum ratio of extra queries, from 0 to 1
+           - methods: the methods (get or post) of the queries that may be hedged
+           - min_samples: the number of latencies observed before queries are
+                          hedged, when the delay is not fixed
+           - workers: the number of threads running the synchronous queries that
+                      may be hedged. The other ones run in the thread of the caller
+        """
+        self.delay = delay
+        self.percentile = percentile
+        self.budget = budget
+        self.methods = methods
+        self.min_samples = min_samples
+        self.workers = workers
+
+        # Number of queries, of hedged queries, and of hedged queries that won
+        self.queries = 0
+        self.hedges = 0
+        self.wins = 0
+
+        # The Histogram of the latencies of each bot, by URL
+        self._latencies = {}
+        self._executor = None
+        # Number of threads of the executor in use
+        self._threads = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return 'hedging(%d hedges, %d wins, for %d queries)' % (self.hedges, self.wins, self.queries)
+
+    def get_delay(self, url: str = None) -> float:
+        """returns the delay in seconds before a query to the bot of the given
+           URL is hedged, or None if not enough latencies were observed yet
+        """
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            latency = self._latencies.get(url)
+            if latency is None or latency.count < self.min_samples:
+                return None
+            return latency.get_percentile(self.percentile)
+
+    def close(self):
+        """Stop the threads running the synchronous queries"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def call(self, method: str, function, *args, record: CallRecord = None, url: str = None):
+        """Call function(*args, record), which sends a query to the bot of the
+           given URL, and call it again if it did not return after the delay.
+           Returns the first result, or raises the last error if all the calls
+           failed. The details of the winning call are kept in the record, if any.
+        """
+        delay = self.get_delay(url) if method in self.methods else None
+        self._count_query()
+        start = time.perf_counter()
+        if delay is None or not self._may_hedge() or not self._reserve_thread():
+            result = function(*args, record)
+            self._add_latency(url, time.perf_counter() - start)
+            return result
+
+        executor = self._get_executor()
+        records = [_new_record(record)]
+        futures = [self._submit(executor, function, args, records[0])]
+        self._observe(url, futures[0], start)
+
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._reserve_thread():
+            if self._acquire():
+                records.append(_new_record(record))
+                futures.append(self._submit(executor, function, args, records[1]))
+            else:
+                self._release_thread()
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    # The other query is not needed anymore
+                    for other in pending:
+                        other.cancel()
+                    return self._win(futures.index(future), future.result(), records, record)
+        raise error
+
+    async def call_async(self, method: str, function, *args, record: CallRecord = None, url: str = None):
+        """The asyncio version of call: function(*args, record) is a coroutine"""
+        delay = self.get_delay(url) if method in self.methods else None
+        self._count_query()
+        start = time.perf_counter()
+        if delay is None or not self._may_hedge():
+            result = await function(*args, record)
+            self._add_latency(url, time.perf_counter() - start)
+            return result
+
+        records = [_new_record(record)]
+        tasks = [asyncio.ensure_future(function(*args, records[0]))]
+        self._observe(url, tasks[0], start)
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._acquire():
+                records.append(_new_record(record))
+                tasks.append(asyncio.ensure_future(function(*args, records[1])))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return self._win(tasks.index(task), task.result(), records, record)
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _submit(self, executor, function, args, record):
+        """Run a call in a thread reserved with _reserve_thread"""
+        future = executor.submit(function, *args, record)
+        future.add_done_callback(lambda _: self._release_thread())
+        return future
+
+    def _reserve_thread(self) -> bool:
+        """returns True if a thread of the executor is available, and reserves it"""
+        with self._lock:
+            if self._threads >= self.workers:
+                return False
+            self._threads += 1
+            return True
+
+    def _release_thread(self):
+        with self._lock:
+            self._threads -= 1
+
+    def _count_query(self):
+        with self._lock:
+            self.queries += 1
+
+    def _may_hedge(self) -> bool:
+        """returns True if the budget allows one more hedged query, without
+           reserving it
+        """
+        with self._lock:
+            return self.hedges + 1 <= self.budget * self.queries
+
+    def _acquire(self) -> bool:
+        """returns True if the budget allows one more hedged query"""
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.queries:
+                return False
+            self.hedges += 1
+            return True
+
+    def _add_latency(self, url: str, latency: float):
+        with self._lock:
+            histogram = self._latencies.get(url)
+            if histogram is None:
+                histogram = self._latencies[url] = Histogram()
+            histogram.add(latency)
+
+    def _observe(self, url: str, future, start: float):
+        """Add the latency of the first query to the histogram of the bot, once
+           it succeeded. A hedged query answering sooner would lower the delay.
+           A synchronous first query runs to its end even if it lost; a
+           cancelled asynchronous one is not observed
+        """
+        def done(future):
+            if not future.cancelled() and future.exception() is None:
+                self._add_latency(url, time.perf_counter() - start)
+
+        future.add_done_callback(done)
+
+    def _win(self, index: int, result, records, record):
+        if index:
+            with self._lock:
+                self.wins += 1
+        if record is not None:
+            for name in CallRecord.__slots__:
+                setattr(record, name, getattr(records[index], name))
+        return result
+
+
+def _new_record(record: CallRecord):
+    """returns a record for one of the hedged calls, if the query is recorded"""
+    return CallRecord(record.client, record.method) if record is not None else None
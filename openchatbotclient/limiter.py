@@ -0,0 +1,395 @@
+"""Rate limiting and adaptive concurrency of the queries to the bots.
+
+Partner bots publish quotas, and answer with the 429 or 503 codes when they
+are overloaded. A Limiter, given to one or many clients, keeps for each bot
+(by its base URL):
+
+    - a token bucket: at most "rate" queries per second, with bursts of at
+      most "burst" queries
+    - an adaptive concurrency limit: the number of queries in flight is
+      limited, and the limit follows an AIMD law (additive increase,
+      multiplicative decrease). It grows by one query each time a full limit
+      of queries succeeded, and is multiplied by backoff when the bot is
+      overloaded: 429 or 503 code, timeout, or a latency exceeding tolerance
+      times the lowest latency observed. The queries sent before a decrease
+      do not decrease it again, so that a burst of errors only counts once.
+
+    from openchatbotclient import Client
+    from openchatbotclient.limiter import Limiter
+
+    limiter = Limiter(rate=20, burst=5, concurrency=8, rates={'https://small.bot.com/api/ask': 2})
+    bots = [Client('https://callbot.konverso.ai', 443, limiter=limiter), ...]
+
+The queries wait for their turn, up to their timeout: a query that cannot
+be sent before its timeout expires fails with a RateLimitError, without
+being sent. The second query sent by a hedging policy waits for its own
+slot and token. A Limiter may be shared by threads and asyncio tasks.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The hedged queries are limited as well
+"""
+
+import threading
+import time
+
+from collections import deque
+
+from .exception import ChatbotServerError, RateLimitError
+
+# The codes of the bots that are overloaded
+OVERLOAD_CODES = (429, 503)
+
+CONCURRENCY_MAXIMUM_DEFAULT = 256
+BACKOFF_DEFAULT = 0.5
+TOLERANCE_DEFAULT = 3.0
+
+# Weight of a latency in the baseline latency, when it is above the baseline.
+# The baseline slowly follows the bot when it gets durably slower.
+_BASELINE_DRIFT = 0.01
+
+
+def get_wait_timeout(timeout):
+    """returns the maximum time in seconds to wait for a query given its
+       timeout, which may be a (connect, read) pair
+    """
+    if isinstance(timeout, tuple):
+        return sum(value for value in timeout if value) or None
+    return timeout
+
+
+def is_overload(error: Exception) -> bool:
+    """returns True if an exception shows that the bot is overloaded"""
+    if isinstance(error, ChatbotServerError):
+        return error.status in OVERLOAD_CODES
+    # The timeouts of requests and httpx
+    return 'Timeout' in type(error).__name__
+
+
+class TokenBucket:
+    """At most rate queries per second, with bursts of at most burst queries"""
+
+    def __init__(self, rate: float, burst: float = None):
+        assert rate > 0
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout: float = None) -> float:
+        """Reserve a token, and returns the time in seconds to wait before
+           using it, or None if this time exceeds the timeout. The token is
+           then not reserved
+        """
+        with self._lock:
+            now = time.perf_counter()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if timeout is not None and delay > timeout:
+                return None
+            # The tokens may be negative: they are reserved by the waiting queries
+            self.tokens -= 1
+            return delay
+
+
+class _ThreadWaiter:
+    __slots__ = ('event',)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def wake(self):
+        self.event.set()
+
+
+class _TaskWaiter:
+    __slots__ = ('loop', 'future')
+
+    def __init__(self):
+        import asyncio
+        self.loop = asyncio.get_event_loop()
+        self.future = self.loop.create_future()
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self._set)
+
+    def _set(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """An AIMD limit of the queries in flight to a bot, see above"""
+
+    def __init__(self, limit: float = 8, minimum: int = 1, maximum: int = CONCURRENCY_MAXIMUM_DEFAULT,
+                 backoff: float = BACKOFF_DEFAULT, tolerance: float = TOLERANCE_DEFAULT):
+        """Create a concurrency limit. The constructor parameters are:
+           - limit: the initial limit
+           - minimum, maximum: the bounds of the limit
+           - backoff: the factor applied to the limit when the bot is overloaded
+           - tolerance: the latency is an overload when it exceeds tolerance
+                        times the baseline latency. None disables it
+        """
+        self.limit = float(limit)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+
+        self.inflight = 0
+        # The lowest latency observed, slowly drifting up
+        self.baseline = None
+        self.decreases = 0
+
+        self._decreased = 0.0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return 'concurrency(%d/%.1f in flight)' % (self.inflight, self.limit)
+
+    def _try_acquire(self, waiter_class):
+        """returns the start time of the query if a slot is available,
+           otherwise queues a new waiter and returns it
+        """
+        with self._lock:
+            if self.inflight < int(self.limit) and not self._waiters:
+                self.inflight += 1
+                return time.perf_counter(), None
+            waiter = waiter_class()
+            self._waiters.append(waiter)
+            return None, waiter
+
+    def _cancel(self, waiter) -> bool:
+        """Remove a waiter that timed out. returns False if it was given a
+           slot in the meantime
+        """
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return True
+            except ValueError:
+                return False
+
+    def acquire(self, timeout: float = None) -> float:
+        """Wait for a slot, and returns the start time of the query, or None
+           if no slot was available within the timeout
+        """
+        start, waiter = self._try_acquire(_ThreadWaiter)
+        if start is not None:
+            return start
+        if not waiter.event.wait(timeout) and self._cancel(waiter):
+            return None
+        return time.perf_counter()
+
+    async def acquire_async(self, timeout: float = None) -> float:
+        """The asyncio version of acquire"""
+        import asyncio
+        start, waiter = self._try_acquire(_TaskWaiter)
+        if start is not None:
+            return start
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if self._cancel(waiter):
+                return None
+        except asyncio.CancelledError:
+            if not self._cancel(waiter):
+                self.release(None)
+            raise
+        return time.perf_counter()
+
+    def release(self, start: float, latency: float = None, error: Exception = None):
+        """Release the slot of a query started at start, given its latency if it
+           succeeded, or its error. start is None when the query was not sent
+        """
+        with self._lock:
+            self.inflight -= 1
+            if start is not None:
+                self._update(start, latency, error)
+
+            # Hand the free slots over to the waiters
+            woken = []
+            while self._waiters and self.inflight < int(self.limit):
+                self.inflight += 1
+                woken.append(self._waiters.popleft())
+        for waiter in woken:
+            waiter.wake()
+
+    def _update(self, start: float, latency: float, error: Exception):
+        if error is None:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * _BASELINE_DRIFT
+            overload = self.tolerance is not None and latency > self.baseline * self.tolerance
+        else:
+            overload = is_overload(error)
+            if not overload:
+                # Other errors say nothing about the load of the bot
+                return
+
+        if overload:
+            if start >= self._decreased:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._decreased = time.perf_counter()
+                self.decreases += 1
+        elif self.inflight * 2 >= self.limit:
+            # The limit only grows when it is actually used
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class BotLimit:
+    """The rate and concurrency limits of one bot"""
+
+    def __init__(self, url: str, bucket: TokenBucket = None, concurrency: AdaptiveConcurrency = None):
+        self.url = url
+        self.bucket = bucket
+        self.concurrency = concurrency
+
+    def __str__(self):
+        return 'limit(%s: %s, %s)' % (self.url, '%.1f queries/s' % self.bucket.rate if self.bucket else 'no rate',
+                                      self.concurrency or 'no concurrency limit')
+
+    def _get_remaining(self, timeout, start):
+        if timeout is None:
+            return None
+        return timeout - (time.perf_counter() - start)
+
+    def acquire(self, timeout: float = None) -> float:
+        """Wait for a concurrency slot and a token, and returns the start time
+           of the query. Raises a RateLimitError if they are not available
+           within the timeout
+        """
+        begin = time.perf_counter()
+        start = begin
+        if self.concurrency is not None:
+            start = self.concurrency.acquire(timeout)
+            if start is None:
+                raise RateLimitError(self.url, timeout)
+        if self.bucket is not None:
+            delay = self.bucket.reserve(self._get_remaining(timeout, begin))
+            if delay is None:
+                self.cancel()
+                raise RateLimitError(self.url, timeout)
+            if delay:
+                time.sleep(delay)
+                start = time.perf_counter()
+        return start
+
+    async def acquire_async(self, timeout: float = None) -> float:
+        """The asyncio version of acquire"""
+        import asyncio
+        begin = time.perf_counter()
+        start = begin
+        if self.concurrency is not None:
+            start = await self.concurrency.acquire_async(timeout)
+            if start is None:
+                raise RateLimitError(self.url, timeout)
+        if self.bucket is not None:
+            delay = self.bucket.reserve(self._get_remaining(timeout, begin))
+            if delay is None:
+                self.cancel()
+                raise RateLimitError(self.url, timeout)
+            if delay:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self.cancel()
+                    raise
+                start = time.perf_counter()
+        return start
+
+    def release(self, start: float, latency: float = None, error: Exception = None):
+        """Release the slot of a query, given its latency or its error"""
+        if self.concurrency is not None:
+            self.concurrency.release(start, latency, error)
+
+    def cancel(self):
+        """Release the slot of a query that was not sent"""
+        if self.concurrency is not None:
+            self.concurrency.release(None)
+
+
+class Limiter:
+
+    def __init__(self, rate: float = None, burst: float = None, concurrency: int = None,
+                 max_concurrency: int = CONCURRENCY_MAXIMUM_DEFAULT, backoff: float = BACKOFF_DEFAULT,
+                 tolerance: float = TOLERANCE_DEFAULT, rates: dict = None):
+        """Create a limiter, keeping the limits of each bot. The constructor parameters are:
+           - rate: optional, the maximum number of queries per second to each bot
+           - burst: optional, the maximum number of queries sent at once. Default
+                    is one second of queries
+           - concurrency: optional, the initial limit of the queries in flight to
+                          each bot. None disables the adaptive concurrency limit
+           - max_concurrency, backoff, tolerance: the parameters of the
+                          adaptive concurrency, see AdaptiveConcurrency
+           - rates: optional, a dict of the rates of some bots, by base URL,
+                    or of (rate, burst) pairs
+        """
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.rates = dict(rates or {})
+
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return 'limiter(%d bots)' % len(self._limits)
+
+    def get(self, url: str) -> BotLimit:
+        """returns the limits of the bot of a base URL"""
+        limit = self._limits.get(url)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.get(url)
+                if limit is None:
+                    limit = self._limits[url] = self._create(url)
+        return limit
+
+    def _create(self, url: str) -> BotLimit:
+        rate, burst = self.rates.get(url, self.rate), self.burst
+        if isinstance(rate, tuple):
+            rate, burst = rate
+        bucket = TokenBucket(rate, burst) if rate else None
+        concurrency = None
+        if self.concurrency is not None:
+            concurrency = AdaptiveConcurrency(self.concurrency, maximum=self.max_concurrency,
+                                              backoff=self.backoff, tolerance=self.tolerance)
+        return BotLimit(url, bucket, concurrency)
+
+
+#
+# Sample code: a bot queried by 64 threads. The latency of the stub grows when
+# it is overloaded: the limit oscillates around the concurrency it sustains
+#
+if __name__ == '__main__':
+    from concurrent.futures import ThreadPoolExecutor
+
+    from openchatbotclient.client import Client
+    from openchatbotclient.stub import StubProcess
+    from openchatbotclient.transport import Transport
+
+    with StubProcess(latency=0.02) as server:
+        limiter = Limiter(concurrency=4)
+        client = Client(server.host, server.port, transport=Transport(pool_maxsize=64), limiter=limiter)
+        limit = limiter.get(client.base_url).concurrency
+
+        def ask(i):
+            client.ask("john", "hello %d" % i)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            for i, _ in enumerate(executor.map(ask, range(2000))):
+                if i % 200 == 0:
+                    print("%5d queries: %s, baseline %.1fms" % (i, limit, (limit.baseline or 0) * 1000))
+        print("%.1f queries/s, %d decreases" % (2000 / (time.perf_counter() - start), limit.decreases))
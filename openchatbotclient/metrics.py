@@ -0,0 +1,275 @@
+"""Instrumentation of the Open Chat Bot clients.
+
+Hooks may be installed on clients and client groups. Each query to a bot is
+then described by a CallRecord, given to the on_call method of the hooks, and
+each group query by a GroupCallRecord, given to their on_group_call method.
+
+The Metrics hook keeps in-process statistics for each bot: latency
+percentiles, errors, status codes and payload sizes. They may be exported
+in the Prometheus text format:
+
+    from openchatbotclient.metrics import Metrics
+
+    metrics = Metrics()
+    bots.add_hook(metrics)
+    responses = bots.ask("amedee", "hello")
+
+    print(metrics.get_percentiles(bots[0].base_url))
+    print(metrics.export_prometheus())
+
+Any function may also be used as a hook with the CallbackHook class. Clients
+without hooks do not build records, so that the instrumentation costs nothing
+when unused.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: Adding Histogram.merge
+"""
+
+import bisect
+import math
+import threading
+
+
+class CallRecord:
+    """The description of one query to a bot. The durations are in seconds:
+       - connect: time to resolve the host and open the TCP connection, or 0
+                  if a pooled connection was reused
+       - tls: time of the TLS handshake, or 0 if a pooled connection was reused
+       - ttfb: time until the response headers were received
+       - total: time until the response was received and decoded
+       The sizes are in bytes, and status_code is the HTTP status code. code is
+       the status code returned by the bot in its response. error is the name
+       of the exception raised by the query, if any.
+    """
+
+    __slots__ = ('client', 'bot', 'method',
+                 'connect', 'tls', 'ttfb', 'total',
+                 'request_size', 'response_size',
+                 'status_code', 'code', 'error')
+
+    def __init__(self, client, method: str):
+        self.client = client
+        self.bot = client.base_url
+        self.method = method
+        self.connect = 0
+        self.tls = 0
+        self.ttfb = None
+        self.total = None
+        self.request_size = 0
+        self.response_size = 0
+        self.status_code = None
+        self.code = None
+        self.error = None
+
+    def __str__(self):
+        return 'call(%s: %s in %.3fs)' % (self.bot, self.error or self.code, self.total or 0)
+
+
+class GroupCallRecord:
+    """The description of one query to a client group:
+       - total: the time in seconds until the group answered
+       - responses: the number of bots that answered
+       - errors: the number of bots that failed, or were late
+    """
+
+    __slots__ = ('group', 'total', 'responses', 'errors')
+
+    def __init__(self, group, total: float, responses: int, errors: int):
+        self.group = group
+        self.total = total
+        self.responses = responses
+        self.errors = errors
+
+
+class Hook:
+    """Parent of the hooks. Hooks must be thread safe, and should be fast,
+       as they are called synchronously after each query
+    """
+
+    def on_call(self, record: CallRecord):
+        pass
+
+    def on_group_call(self, record: GroupCallRecord):
+        pass
+
+
+class CallbackHook(Hook):
+    """A hook calling a function with each record"""
+
+    def __init__(self, on_call=None, on_group_call=None):
+        self._on_call = on_call
+        self._on_group_call = on_group_call
+
+    def on_call(self, record: CallRecord):
+        if self._on_call:
+            self._on_call(record)
+
+    def on_group_call(self, record: GroupCallRecord):
+        if self._on_group_call:
+            self._on_group_call(record)
+
+
+class Histogram:
+    """A histogram of durations, with logarithmic buckets. The percentiles
+       are estimated within the width of a bucket, about 10%
+    """
+
+    # Upper bounds of the buckets, in seconds: from 0.1ms to about 2 minutes
+    BOUNDS = [0.0001 * 2 ** (i / 4) for i in range(81)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        """Add the values of another histogram to this one"""
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def get_percentile(self, percentile: float) -> float:
+        """returns the estimated value below which percentile % of the values are"""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percentile / 100)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        if index == len(self.BOUNDS):
+            return self.BOUNDS[-1]
+        # Middle of the bucket, on a logarithmic scale
+        lower = self.BOUNDS[index - 1] if index else 0
+        return math.sqrt(lower * self.BOUNDS[index]) if lower else self.BOUNDS[index]
+
+
+class BotMetrics:
+    """The statistics of one bot"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.ttfb = Histogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # Number of calls by HTTP status code, and by exception name
+        self.status_codes = {}
+        self.errors = {}
+
+
+class Metrics(Hook):
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        # The metrics of each bot, by URL
+        self.bots = {}
+        self.group = Histogram()
+        self._lock = threading.Lock()
+
+    def on_call(self, record: CallRecord):
+        with self._lock:
+            bot = self.bots.get(record.bot)
+            if bot is None:
+                bot = self.bots[record.bot] = BotMetrics()
+            if record.total is not None:
+                bot.latency.add(record.total)
+            if record.ttfb is not None:
+                bot.ttfb.add(record.ttfb)
+            bot.request_bytes += record.request_size
+            bot.response_bytes += record.response_size
+            if record.status_code is not None:
+                bot.status_codes[record.status_code] = bot.status_codes.get(record.status_code, 0) + 1
+            if record.error is not None:
+                bot.errors[record.error] = bot.errors.get(record.error, 0) + 1
+
+    def on_group_call(self, record: GroupCallRecord):
+        with self._lock:
+            self.group.add(record.total)
+
+    def get_percentiles(self, bot: str) -> dict:
+        """returns the latency percentiles of a bot, given its URL, such as:
+           {50: 0.120, 95: 0.350, 99: 0.800}
+        """
+        with self._lock:
+            histogram = self.bots[bot].latency
+            return {p: histogram.get_percentile(p) for p in self.PERCENTILES}
+
+    def get_snapshot(self) -> dict:
+        """returns the statistics of all the bots, as a dict by bot URL"""
+        with self._lock:
+            return {
+                url: {
+                    'count': bot.latency.count,
+                    'latency': {p: bot.latency.get_percentile(p) for p in self.PERCENTILES},
+                    'ttfb': {p: bot.ttfb.get_percentile(p) for p in self.PERCENTILES},
+                    'request_bytes': bot.request_bytes,
+                    'response_bytes': bot.response_bytes,
+                    'status_codes': dict(bot.status_codes),
+                    'errors': dict(bot.errors),
+                }
+                for url, bot in self.bots.items()
+            }
+
+    def export_prometheus(self, prefix: str = 'openchatbot') -> str:
+        """returns the statistics in the Prometheus text exposition format"""
+        lines = []
+
+        def summary(name, labels, histogram):
+            for p in self.PERCENTILES:
+                value = histogram.get_percentile(p)
+                if value is not None:
+                    quantile = ','.join(labels + ['quantile="%s"' % (p / 100)])
+                    lines.append('%s{%s} %f' % (name, quantile, value))
+            suffix = '{%s}' % ','.join(labels) if labels else ''
+            lines.append('%s_sum%s %f' % (name, suffix, histogram.sum))
+            lines.append('%s_count%s %d' % (name, suffix, histogram.count))
+
+        with self._lock:
+            bots = sorted(self.bots.items())
+
+            for metric, attribute in (('ask_latency_seconds', 'latency'), ('ask_ttfb_seconds', 'ttfb')):
+                name = '%s_%s' % (prefix, metric)
+                lines.append('# TYPE %s summary' % name)
+                for url, bot in bots:
+                    summary(name, ['bot="%s"' % _escape(url)], getattr(bot, attribute))
+
+            for metric, attribute in (('ask_request_bytes_total', 'request_bytes'),
+                                      ('ask_response_bytes_total', 'response_bytes')):
+                name = '%s_%s' % (prefix, metric)
+                lines.append('# TYPE %s counter' % name)
+                for url, bot in bots:
+                    lines.append('%s{bot="%s"} %d' % (name, _escape(url), getattr(bot, attribute)))
+
+            name = '%s_ask_status_total' % prefix
+            lines.append('# TYPE %s counter' % name)
+            for url, bot in bots:
+                for code, count in sorted(bot.status_codes.items()):
+                    lines.append('%s{bot="%s",code="%s"} %d' % (name, _escape(url), code, count))
+
+            name = '%s_ask_errors_total' % prefix
+            lines.append('# TYPE %s counter' % name)
+            for url, bot in bots:
+                for error, count in sorted(bot.errors.items()):
+                    lines.append('%s{bot="%s",error="%s"} %d' % (name, _escape(url), _escape(error), count))
+
+            name = '%s_group_ask_latency_seconds' % prefix
+            lines.append('# TYPE %s summary' % name)
+            summary(name, [], self.group)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,275 @@
+"""Ranking of the responses of a client group.
+
+A scorer gives a score to each response, the higher the better. The best
+response, or the k best ones, are then selected in a single pass over the
+responses, without sorting them:
+
+    from openchatbotclient.ranking import BotScore, LatencyWeighted, get_best, get_top
+
+    best = get_best(responses, LatencyWeighted(BotScore(), half_life=1.0))
+    three = get_top(responses, 3)
+
+The available scorers are:
+    - BotScore: the score returned by the bot
+    - PriorityScore: the first bot of the group wins
+    - LatencyWeighted: another score, penalized by the latency: halved each
+      time the latency increases by half_life seconds, or decreased by a
+      penalty per second
+    - TextScore: a heuristic on the text, penalizing the empty, short and
+      fallback answers
+    - KeyScore: the score given by a function of the response
+    - Combined: a weighted sum of scores
+
+A Ranker keeps the best responses while they are received, so that the
+current best answer is known before all the bots answered:
+
+    ranker = Ranker(BotScore(), on_change=lambda response, score: print(response))
+    responses = bots.ask("amedee", "hello", concurrent=True, ranker=ranker)
+
+The scorers are given each response with its position: the index of its
+client in the group, or of the response in its response group.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: LatencyWeighted penalizes the negative scores, and the Ranker
+                  notifies the changes in order
+"""
+
+import heapq
+import threading
+
+
+class Scorer:
+    """Parent of the scorers"""
+
+    def score(self, response, position: int = 0) -> float:
+        """returns the score of a response, the higher the better"""
+        raise NotImplementedError()
+
+
+class BotScore(Scorer):
+    """The score returned by the bot, 0 if none"""
+
+    def score(self, response, position: int = 0) -> float:
+        return response.score or 0
+
+
+class PriorityScore(Scorer):
+    """The first bot of the group has the best score"""
+
+    def score(self, response, position: int = 0) -> float:
+        return -position
+
+
+class LatencyWeighted(Scorer):
+    """The score of another scorer, moved towards 0 by half each time the
+       latency of the response increases by half_life seconds: a positive score
+       is halved, a negative one is doubled. With a penalty, the score is
+       instead decreased by penalty per second of latency, which suits the
+       scores that are often 0 or negative, such as PriorityScore.
+       The responses of unknown latency are not penalized.
+    """
+
+    def __init__(self, scorer: Scorer = None, half_life: float = 1.0, penalty: float = None):
+        self.scorer = scorer or BotScore()
+        self.half_life = half_life
+        self.penalty = penalty
+
+    def score(self, response, position: int = 0) -> float:
+        score = self.scorer.score(response, position)
+        if response.latency is None:
+            return score
+        if self.penalty is not None:
+            return score - self.penalty * response.latency
+        factor = 0.5 ** (response.latency / self.half_life)
+        # A slower response always has a lower score
+        return score * factor if score >= 0 else score / factor
+
+
+class TextScore(Scorer):
+    """A heuristic on the text of the response: 0 when empty or a fallback
+       answer, such as "Sorry, I don't understand", and up to 1 for a text of
+       ideal_length characters or more
+    """
+
+    FALLBACKS = ("don't understand", "do not understand", "didn't understand", "did not understand",
+                 "can you rephrase", "could you rephrase")
+
+    def __init__(self, ideal_length: int = 40, fallbacks=FALLBACKS):
+        self.ideal_length = ideal_length
+        self.fallbacks = tuple(fallback.lower() for fallback in fallbacks)
+
+    def score(self, response, position: int = 0) -> float:
+        text = (response.text or '').strip()
+        if not text:
+            return 0.0
+        lowered = text.lower()
+        if any(fallback in lowered for fallback in self.fallbacks):
+            return 0.0
+        return min(1.0, len(text) / self.ideal_length)
+
+
+class KeyScore(Scorer):
+    """The score given by a function of the response"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def score(self, response, position: int = 0) -> float:
+        return self.key(response)
+
+
+class Combined(Scorer):
+    """A weighted sum of scores. The constructor is given (scorer, weight) pairs"""
+
+    def __init__(self, *scorers):
+        self.scorers = scorers
+
+    def score(self, response, position: int = 0) -> float:
+        return sum(scorer.score(response, position) * weight for scorer, weight in self.scorers)
+
+
+SCORER_DEFAULT = BotScore()
+
+
+def get_best(responses, scorer: Scorer = None, positions=None):
+    """returns the response having the best score, the first one winning the
+       ties, or None if there is no response. positions are the positions of
+       the responses, by default their index
+    """
+    scorer = scorer or SCORER_DEFAULT
+    best = None
+    best_score = None
+    for index, response in enumerate(responses):
+        score = scorer.score(response, positions[index] if positions is not None else index)
+        if best_score is None or score > best_score:
+            best = response
+            best_score = score
+    return best
+
+
+def get_top(responses, k: int, scorer: Scorer = None, positions=None) -> list:
+    """returns the k responses having the best scores, best first. The first
+       responses win the ties. positions are the positions of the responses,
+       by default their index
+    """
+    scorer = scorer or SCORER_DEFAULT
+    if k == 1:
+        best = get_best(responses, scorer, positions)
+        return [best] if best is not None else []
+    responses = list(responses)
+    if positions is None:
+        scores = [scorer.score(response, index) for index, response in enumerate(responses)]
+    else:
+        scores = [scorer.score(response, position) for response, position in zip(responses, positions)]
+    # nlargest keeps the first indexes on ties
+    return [responses[index] for index in heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)]
+
+
+class Ranker:
+    """Keeps the k best responses while they are received. Thread safe."""
+
+    def __init__(self, scorer: Scorer = None, k: int = 1, on_change=None):
+        """Create a ranker. The constructor parameters are:
+           - scorer: the Scorer of the responses, default is BotScore
+           - k: the number of best responses kept
+           - on_change: optional, a function called with the response and
+                        its score when the best response changes. The calls
+                        are made in the order of the changes
+        """
+        assert k > 0
+        self.scorer = scorer or SCORER_DEFAULT
+        self.k = k
+        self.on_change = on_change
+        self.count = 0
+
+        # A min-heap of (score, -count, response): the worst response kept
+        # is replaced first, and the first responses win the ties
+        self._heap = []
+        self._best = None
+        # Reentrant, as on_change is called with the lock held
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        return 'ranker(%d responses, best %s)' % (self.count, self.best)
+
+    def add(self, response, position: int = None) -> bool:
+        """Add a response, at the given position (by default the number of
+           responses added before). returns True if it is the new best response
+        """
+        with self._lock:
+            if position is None:
+                position = self.count
+            score = self.scorer.score(response, position)
+            entry = (score, -self.count, response)
+            self.count += 1
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+            is_best = self._best is None or score > self._best[0]
+            if is_best:
+                self._best = entry
+                if self.on_change:
+                    self.on_change(response, score)
+        return is_best
+
+    @property
+    def best(self):
+        """The best response received so far, or None"""
+        best = self._best
+        return best[2] if best is not None else None
+
+    @property
+    def best_score(self) -> float:
+        """The score of the best response received so far, or None"""
+        best = self._best
+        return best[0] if best is not None else None
+
+    def get_top(self) -> list:
+        """returns the k best responses received so far, best first"""
+        with self._lock:
+            entries = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [response for _, _, response in entries]
+
+    def reset(self):
+        with self._lock:
+            self._heap = []
+            self._best = None
+            self.count = 0
+
+
+#
+# Sample code, comparing the selection of the top responses with a sort
+#
+if __name__ == '__main__':
+    import random
+    import time
+
+    from openchatbotclient.response import Response
+
+    random.seed(1)
+    responses = [Response(None, {'response': {'text': 'hello', 'score': random.random()}})
+                 for _ in range(100000)]
+
+    start = time.perf_counter()
+    for _ in range(10):
+        expected = sorted(responses, key=lambda response: response.score, reverse=True)[:5]
+    print("Sort:    %.1fms" % ((time.perf_counter() - start) * 100))
+
+    start = time.perf_counter()
+    for _ in range(10):
+        top = get_top(responses, 5)
+    print("get_top: %.1fms" % ((time.perf_counter() - start) * 100))
+    assert top == expected
+
+    ranker = Ranker(k=5)
+    for response in responses:
+        ranker.add(response)
+    assert ranker.get_top() == expected and ranker.best is expected[0]
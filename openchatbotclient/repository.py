@@ -10,42 +10,106 @@ Authors:
 
 History:
     - 2020/11/02: Amédée: Initial version.
+    - 2026/10/18: Adding the descriptor cache, and the pooled transport
+    - 2026/10/18: Adding the bulk lookups of descriptors
+    - 2026/10/18: JSON is decoded with the codec module
+    - 2026/10/18: Adding the scheme, to look up local or test servers
 
 """
 
-import json
-import requests
-
+from . import codec
 
 from .exception import NoChatbotDescriptorError, InvalidChatbotDescriptorError
 
 from .descriptor import Descriptor
 
+from .concurrency import imap
+
+from .transport import Transport
+
 
 DESCRIPTOR_PATH = "/.well-known/openchatbot-configuration"
 
+# Number of domains looked up in parallel by the bulk methods
+WORKERS_DEFAULT = 32
+
 class Repository:
-    def __init__(self):
-        pass
+    def __init__(self, cache=None, transport: Transport = None, scheme: str = 'https'):
+        """Create a repository. The constructor parameters are:
+           - cache: optional, a DescriptorCache instance. Without a cache,
+                    the descriptors are retrieved again on each lookup
+           - transport: optional, a transport instance shared with other
+                        repositories or clients
+           - scheme: the scheme of the descriptor URLs. Only local or test
+                     servers should be looked up with http
+        """
+        self.cache = cache
+        self.scheme = scheme
+
+        self._owns_transport = transport is None
+        self.transport = transport or Transport()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the connections of this repository, unless its transport
+           is shared
+        """
+        if self._owns_transport:
+            self.transport.close()
 
     def get_descriptor_url(self, domain):
-        return "https://%s%s" % (domain, DESCRIPTOR_PATH)
+        return "%s://%s%s" % (self.scheme, domain, DESCRIPTOR_PATH)
 
-    def get_descriptor(self, domain, headers=None, data=None, auth=None):
+    def get_descriptor(self, domain, headers=None, data=None, auth=None, timeout=None):
         """Given a particular domain, attempts to retrieve the related
            descriptor
+
+           The cache, if any, is not used for the requests having data
+           or authentication.
         """
 
+        cache = self.cache if data is None and auth is None else None
+
+        entry = cache.get(domain) if cache is not None else None
+        if entry is not None:
+            if entry.is_fresh():
+                return entry.get_descriptor()
+
+            # Expired: only download the descriptor again if it changed
+            headers = dict(headers or {}, **entry.get_validators())
+
         url = self.get_descriptor_url(domain)
-        r = requests.get(url, headers=headers, data=data, auth=auth, verify=False)
+        r = self.transport.get(url, headers=headers, data=data, auth=auth, timeout=timeout)
 
         if r is None:
             raise NoChatbotDescriptorError()
 
+        if r.status_code == 304 and entry is not None:
+            cache.refresh(domain, entry, r.headers)
+            return entry.get_descriptor()
+
+        try:
+            descriptor = self.__parse_descriptor(r)
+        except (NoChatbotDescriptorError, InvalidChatbotDescriptorError) as e:
+            if cache is not None:
+                cache.put_error(domain, e)
+            raise
+
+        if cache is not None:
+            cache.put(domain, descriptor, r.headers)
+        return descriptor
+
+    @staticmethod
+    def __parse_descriptor(r):
         if r.status_code in (200, 201, 202, 204, 206):
             # We have a response.. let's validate this is a valid JSON
             try:
-                j = json.loads(r.content)
+                j = codec.loads(r.content)
                 return Descriptor(j)
             except:
                 # Invalid content
@@ -66,22 +130,73 @@ class Repository:
         from .client import Client
         return Client.from_descriptor(desc)
 
+    def get_descriptors(self, domains, headers=None, auth=None, timeout=None, workers: int = WORKERS_DEFAULT):
+        """Given an iterable of domains, retrieves their descriptors in parallel.
+           Yields (domain, result) pairs as soon as each lookup completes, where
+           result is either a Descriptor or the exception raised by the lookup.
+
+           - timeout: the timeout in seconds of each lookup
+           - workers: the number of lookups in parallel. The domains are read
+                      lazily from the iterable, as lookups complete
+        """
+
+        def lookup(domain):
+            try:
+                return self.get_descriptor(domain, headers=headers, auth=auth, timeout=timeout)
+            except Exception as e:
+                return e
+
+        for domain, result in imap(lookup, domains, workers=workers):
+            yield domain, result
+
+    def get_client_group(self, domains, headers=None, auth=None, timeout=None, workers: int = WORKERS_DEFAULT,
+                         transport: Transport = None):
+        """Given an iterable of domains, retrieves their descriptors in parallel,
+           and returns a client group of the bots found, in the order of the domains.
+           The domains without a valid descriptor are ignored.
+
+           - transport: optional, a transport shared by all the clients
+        """
+
+        # Inner include to avoid any risk of cyclic imports
+        from .client import Client
+        from .client_group import ClientGroup
+
+        # Position of each domain in the iterable, read lazily
+        positions = {}
+
+        def numbered(domains):
+            for position, domain in enumerate(domains):
+                positions.setdefault(domain, position)
+                yield domain
+
+        found = [(positions[domain], result)
+                 for domain, result in self.get_descriptors(numbered(domains), headers=headers, auth=auth,
+                                                            timeout=timeout, workers=workers)
+                 if isinstance(result, Descriptor)]
+        found.sort(key=lambda item: item[0])
+
+        group = ClientGroup()
+        for _, descriptor in found:
+            group.append(Client.from_descriptor(descriptor, transport=transport))
+        return group
+
 #
 # Sample code, validating the bots of the members of the Alliance for Open Chatbot.
 #
 if __name__ == '__main__':
     repo = Repository()
 
-    for d in ("www.konverso.ai", "www.proxem.com", "www.kwalys.com", "phebe.io", "synapse-developpement.fr", "openchatbot.io"):
+    domains = ("www.konverso.ai", "www.proxem.com", "www.kwalys.com", "phebe.io", "synapse-developpement.fr", "openchatbot.io")
+
+    for d, response in repo.get_descriptors(domains, timeout=10):
 
         print("================================")
         print("Testing domain %s" % d)
         print(repo.get_descriptor_url(d))
         print("================================")
 
-        try:
-            response = repo.get_descriptor(d)
-        except Exception as e:
-            print("Failed due to: %s" % e)
+        if isinstance(response, Exception):
+            print("Failed due to: %s" % response)
         else:
             print(response)
@@ -62,88 +62,252 @@ provides various utilities method to easily retrieve content out of the the JSON
     # Easily get the actual response text:
     resp.get_text()
 
+The most used fields (text, status, bot_name...) are extracted once when the
+response is received. When created from the raw content of the HTTP response,
+the JSON itself is not kept in memory until the bulky parts (medias, context...)
+are accessed: it is then decoded once from the raw content.
+
 Authors:
     - Amédée Potier (amedee.potier@konverso.ai) from Konverso
 
 History:
     - 2020/11/02: Amédée: Initial class implementation
+    - 2026/10/18: Adding the latency of the query, and the ErrorRecord class
+    - 2026/10/18: Adding the score
+    - 2026/10/18: Compact representation, using slots and the raw content
+    - 2026/10/18: Adding to_tuple and from_tuple, to send responses between processes
+    - 2026/10/18: The JSON is decoded once, on its first access
 """
 
+from . import codec
+
 class Response:
 
-    def __init__(self, client, data: dict):
+    __slots__ = ('client', 'latency',
+                 'query', 'user_id', 'code', 'status', 'text', 'score',
+                 'bot_name', 'bot_icon', 'version', 'copyright', 'authors',
+                 '_json', '_raw')
+
+    def __init__(self, client, data: dict, latency: float = None):
         """client is a client instance
            data is a json
+           latency is the time in seconds taken by the query, if known
         """
         self.client = client
-        self.json = data
+        self.latency = latency
+        self._json = data
+        self._raw = None
+        self.__extract(data)
+
+    @classmethod
+    def from_bytes(cls, client, raw: bytes, data: dict = None, latency: float = None):
+        """Create a response from the raw content of the HTTP response.
+           data is the decoded content, if already available. Only the raw
+           content is kept.
+        """
+        if data is None:
+            data = codec.loads(raw)
+        response = cls(client, data, latency=latency)
+        response._json = None
+        response._raw = raw
+        return response
+
+    # The slots sent between processes by to_tuple
+    _STATE = ('latency', 'query', 'user_id', 'code', 'status', 'text', 'score',
+              'bot_name', 'bot_icon', 'version', 'copyright', 'authors')
+
+    def to_tuple(self) -> tuple:
+        """returns a compact tuple of the fields and raw content of the response,
+           without its client, to be sent to another process
+        """
+        raw = self._raw if self._raw is not None else codec.dumps(self._json)
+        return tuple(getattr(self, name) for name in self._STATE) + (raw,)
+
+    @classmethod
+    def from_tuple(cls, client, values: tuple):
+        """Create a response bound to a client, given the tuple returned
+           by to_tuple. The raw content is not decoded again.
+        """
+        response = cls.__new__(cls)
+        for name, value in zip(cls._STATE, values):
+            setattr(response, name, value)
+        response.client = client
+        response._json = None
+        response._raw = values[-1]
+        return response
 
     def __str__(self):
         return 'response(%s => %s)' % (self.client, self.text)
 
-    @property
-    def is_success(self):
-        return self.status == 'success'
+    def copy(self, client=None, user_id: str = None, latency: float = None):
+        """returns a copy of this response, sharing its content. It may be
+           bound to another client and user, such as when given from a cache
+        """
+        cls = type(self)
+        response = cls.__new__(cls)
+        for klass in cls.__mro__:
+            for name in getattr(klass, '__slots__', ()):
+                if hasattr(self, name):
+                    setattr(response, name, getattr(self, name))
+        if client is not None:
+            response.client = client
+        if user_id is not None:
+            response.user_id = user_id
+        if latency is not None:
+            response.latency = latency
+        return response
 
-    #
-    # Set of utility properties to grab the most typical data
-    # from the json
-    #
+    def __extract(self, data: dict):
+        """Extract the most typical data from the json"""
+        response = data.get('response', {})
+        status = data.get('status', {})
+        meta = data.get('meta', {})
+
+        #
+        # Related to the query:
+        #
+        self.query = response.get('query', '')
+        self.user_id = response.get('userId', '')
+
+        #
+        # Response data:
+        # - code: the HTTP response code, such as 200
+        # - status: the string 'success' if success
+        # - text: the textual response received
+        # - score: the confidence score of the response, if provided by the bot
+        #
+        self.code = status.get('code', 0)
+        self.status = status.get('status', '')
+        self.text = response.get('text', '')
+        self.score = response.get('score', 0)
+
+        #
+        # Related to the remote bot:
+        # - bot_name: the name of the remote bot
+        # - bot_icon: the avatar of the remote bot, as a URL
+        # - version: the software version of the bot returning the response
+        # - copyright: the copyright information of the bot returning the response
+        # - authors: the authors of the bot returning the response
+        #
+        self.bot_name = meta.get('botName', '')
+        self.bot_icon = meta.get('botIcon', '')
+        self.version = meta.get('version', '')
+        self.copyright = meta.get('copyright', '')
+        self.authors = meta.get('authors', [])
 
-    #
-    # Related to the query:
-    #
     @property
-    def query(self) -> str:
-        return self.json.get('response', {}).get('query', '')
+    def json(self) -> dict:
+        """The complete JSON of the response. When the response was created
+           from its raw content, it is decoded on the first access.
+        """
+        if self._json is None:
+            self._json = codec.loads(self._raw)
+        return self._json
 
     @property
-    def user_id(self) -> str:
-        return self.json.get('response', {}).get('userId', '')
+    def is_success(self):
+        return self.status == 'success'
 
     #
-    # Response data
+    # The bulky parts of the response, decoded on their first access
     #
     @property
-    def code(self) -> int:
-        """The HTTP response code, such as 200"""
-        return self.json.get('status', {}).get('code', 0)
+    def medias(self) -> list:
+        """The medias of the response, such as the suggested actions"""
+        return self.json.get('response', {}).get('medias', [])
 
     @property
-    def status(self) -> str:
-        """The string 'success' if success"""
-        return self.json.get('status', {}).get('status', '')
+    def context(self) -> list:
+        """The context of the conversation returned by the bot"""
+        return self.json.get('response', {}).get('context', [])
 
     @property
-    def text(self) -> str:
-        """The textual response received"""
-        return self.json.get('response', {}).get('text', '')
+    def suggestions(self) -> list:
+        return self.json.get('response', {}).get('suggestions', [])
 
     @property
-    def bot_name(self) -> str:
-        """The name of the remote bot"""
-        return self.json.get('meta', {}).get('botName', '')
+    def tts(self) -> list:
+        """The text to speech version of the response"""
+        return self.json.get('response', {}).get('tts', [])
 
-    @property
-    def bot_icon(self) -> str:
-        """The avatar of the remote bot, as a URL"""
-        return self.json.get('meta', {}).get('botIcon', '')
 
+class ErrorRecord:
+    """An error received instead of a Response when querying a client,
+       such as when the bot is down or does not answer in time.
+    """
 
-    #
-    # Other useful metadata
-    #
-    @property
-    def version(self) -> str:
-        """The software version of the bot returning the response"""
-        return self.json.get('meta', {}).get('version', '')
+    __slots__ = ('client', 'error', 'latency', 'user_id', 'query')
 
-    @property
-    def copyright(self) -> str:
-        """The copyright information of the bot returning the response"""
-        return self.json.get('meta', {}).get('copyright', '')
+    def __init__(self, client, error: Exception, latency: float = None, user_id: str = None, query: str = None):
+        """client is a client instance
+           error is the exception raised by the query
+           latency is the time in seconds until the error occurred, if known
+           user_id and query are the ones of the failed query, if known
+        """
+        self.client = client
+        self.error = error
+        self.latency = latency
+        self.user_id = user_id
+        self.query = query
+
+    def __str__(self):
+        return 'error(%s => %s)' % (self.client, self.error)
 
     @property
-    def authors(self) -> list:
-        """The authors of the bot returning the response"""
-        return self.json.get('meta', {}).get('authors', [])
+    def is_success(self):
+        return False
+
+
+#
+# Sample code, comparing the memory and the access time of the compact
+# responses with responses keeping their complete JSON, as they used to.
+#
+if __name__ == '__main__':
+    import json
+    import time
+    import tracemalloc
+
+    class DictResponse:
+        """The former representation: the complete JSON, walked on each access"""
+        def __init__(self, client, data):
+            self.client = client
+            self.json = data
+
+        @property
+        def text(self):
+            return self.json.get('response', {}).get('text', '')
+
+        @property
+        def bot_name(self):
+            return self.json.get('meta', {}).get('botName', '')
+
+    action = {'format': 'button', 'value': {'title': 'Help', 'onClick': '#do Help',
+                                            'displayedMessage': 'Kbot, show me help !'}}
+    raw = json.dumps({
+        'response': {'query': 'hello', 'userId': 'amedee', 'timestamp': 1604337762.158837,
+                     'text': 'Hello Amedee, how can I help you?', 'tts': ['Hello Amedee, how can I help you?'],
+                     'infoURL': '', 'medias': [{'required_actions': [], 'suggested_actions': [action] * 3}],
+                     'context': [], 'suggestions': []},
+        'meta': {'version': '2020.15', 'botIcon': 'https://callbot.konverso.ai/images/kbot_avatar.png',
+                 'botName': 'Kbot', 'copyright': 'Copyright 2018 Konverso.', 'authors': []},
+        'status': {'code': 200, 'status': 'success'}
+    }).encode('utf-8')
+
+    count = 100000
+
+    for name, build in (("Complete JSON", lambda content: DictResponse(None, json.loads(content))),
+                        ("Compact", lambda content: Response.from_bytes(None, content))):
+        tracemalloc.start()
+        # Each HTTP response has its own content, only kept by the compact responses
+        responses = [build(bytes(bytearray(raw))) for i in range(count)]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for response in responses:
+            response.text
+            response.bot_name
+        access = time.perf_counter() - start
+
+        print("%-14s %6d bytes per response, %5.0f ns per access" % (
+            name, memory / count, access * 1e9 / count / 2))
@@ -0,0 +1,135 @@
+"""A cache of the responses of the bots.
+
+Many queries, such as greetings or the clicks on the suggested actions
+("#do Help"), always get the same answer from a given bot. A client having
+a response cache answers them without querying the bot again:
+
+    from openchatbotclient import Client
+    from openchatbotclient.response_cache import ResponseCache
+
+    cache = ResponseCache(maxsize=10000, ttl=600, bypass=[r'^#do Operator'])
+    client = Client('https://callbot.konverso.ai', 443, cache=cache)
+
+The responses are cached by bot URL, query, language and location. The user
+is not part of the key by default: the answer received for one user is given
+to all, which is only right for bots whose answers do not depend on the user.
+A bot personalizing its answers (a name, an account, a history) would leak
+them to the other users: its cache must be created with include_user=True.
+The user_id of a shared response is the one of the query, but its json is
+the original one.
+
+Only the GET queries are cached by default. The POST queries may carry a
+context, and are only cached when given in methods.
+
+Queries that are not idempotent, i.e. that have an effect on the bot side,
+must never be answered from the cache. They are described by the bypass
+parameter: a list of regular expressions, or a function returning True
+for the queries that bypass the cache.
+
+A cache may be shared by several clients. Its hits and misses are counted.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The POST queries are not cached by default
+"""
+
+import re
+import threading
+import time
+
+from collections import OrderedDict
+
+MAXSIZE_DEFAULT = 10000
+
+# Time to live of the responses, in seconds
+TTL_DEFAULT = 300
+
+
+class ResponseCache:
+
+    def __init__(self, maxsize: int = MAXSIZE_DEFAULT, ttl: float = TTL_DEFAULT,
+                 include_user: bool = False, include_location: bool = True,
+                 methods=('get',), bypass=None):
+        """Create a response cache. The constructor parameters are:
+           - maxsize: the number of responses kept. The least recently used
+                      responses are evicted first
+           - ttl: the time to live of the responses, in seconds
+           - include_user: if True, the userId is part of the key. If False, the
+                           default, the responses are shared by all the users:
+                           see above for the bots personalizing their answers
+           - include_location: if True, the location is part of the key
+           - methods: the methods (get or post) of the queries that may be
+                      cached, only get by default
+           - bypass: optional, either a list of regular expressions, or a function
+                     returning True, for the queries that must not be cached
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.include_user = include_user
+        self.include_location = include_location
+        self.methods = methods
+
+        if bypass is None or callable(bypass):
+            self.bypass = bypass
+        else:
+            patterns = [re.compile(pattern) for pattern in bypass]
+            self.bypass = lambda query: any(pattern.search(query) for pattern in patterns)
+
+        self.hits = 0
+        self.misses = 0
+
+        # (expiration time, Response) by key
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_key(self, client, params: dict, method: str):
+        """returns the key of a query, given the parameters sent to the bot,
+           or None if the query must not be cached
+        """
+        if method not in self.methods:
+            return None
+
+        query = params['query']
+        if self.bypass is not None and self.bypass(query):
+            return None
+
+        return (client.base_url, query, params.get('lang'),
+                params.get('location') if self.include_location else None,
+                params['userId'] if self.include_user else None)
+
+    def get(self, key):
+        """returns the cached Response, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -12,16 +12,43 @@ Authors:
 
 History:
     - 2020/11/02: Amédée: Initial class implementation
+    - 2026/10/18: Keeping the error records and the latency of each client
+    - 2026/10/18: Adding the export to a columnar ResponseTable
+    - 2026/10/18: Adding get_with_max_score and get_top, see the ranking module
 """
 
-from .response import Response
+from .ranking import get_best, get_top
+from .response import Response, ErrorRecord
 
 class ResponseGroup(list):
 
+    def __init__(self, *args):
+        super().__init__(*args)
+
+        # The ErrorRecord of each client that failed to answer
+        self.errors = []
+
     def append(self, response: Response):
         assert isinstance(response, Response)
         super().append(response)
 
+    def add_error(self, error: ErrorRecord):
+        assert isinstance(error, ErrorRecord)
+        self.errors.append(error)
+
+    def get_latencies(self):
+        """returns a dict associating each queried client to the time in seconds
+           it took to answer, or to fail
+        """
+        return {item.client: item.latency for item in self.errors + list(self)}
+
+    def to_table(self, actions: bool = True):
+        """returns a ResponseTable with the rows of this group, see the analytics
+           module. The groups of many queries are exported with ResponseTable.from_groups
+        """
+        from .analytics import ResponseTable
+        return ResponseTable.from_groups([self], actions=actions)
+
     def get_first(self):
         """returns the first non empty Response or None of no Response was found
 
@@ -50,10 +77,13 @@ class ResponseGroup(list):
 
         return separator.join(content_list)
 
-    # Add when we have score
-    #
-    #def get_with_max_score(self):
-    #    if not self:
-    #        return None
-    #    s = sorted(self, lambda x: x.get("score", 0))
-    #    return s[-1]
+    def get_with_max_score(self, scorer=None):
+        """returns the Response having the best score, or None if there is no
+           Response. The score is given by a Scorer (see the ranking module),
+           by default the score returned by the bot. The first response wins the ties.
+        """
+        return get_best(self, scorer)
+
+    def get_top(self, k: int, scorer=None) -> list:
+        """returns the k Responses having the best scores, best first"""
+        return get_top(self, k, scorer)
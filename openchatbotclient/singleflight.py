@@ -0,0 +1,142 @@
+"""Coalescing of identical queries in flight.
+
+When many users send the same message to the same bot at the same time,
+such as the opening message of a campaign, a client in single-flight mode
+only sends the first one to the bot. The identical queries received while it
+is in flight wait for its response, and each one gets its own copy:
+
+    from openchatbotclient import Client
+    from openchatbotclient.singleflight import SingleFlight
+
+    client = Client('https://callbot.konverso.ai', 443, single_flight=SingleFlight())
+
+Queries are identical when they have the same bot URL, query, language and
+location. By default the user is not part of the key, so that the answer
+received for one user is given to all: do not use single-flight for bots
+whose answers depend on the user, or set include_user=True.
+
+Each query waits at most its own timeout, whatever the timeout of the query
+in flight: a TimeoutError is raised when it expires. A query in flight whose
+asyncio callers all gave up is cancelled.
+
+A SingleFlight instance may be shared by several clients, used both from
+threads and from asyncio tasks.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The callers wait at most their timeout
+"""
+
+import asyncio
+import threading
+
+from .limiter import get_wait_timeout
+
+
+class _Call:
+    """A query in flight, waited for by threads"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self, include_user: bool = False):
+        """Create a single-flight group. The constructor parameters are:
+           - include_user: if True, only the queries of the same user are coalesced
+        """
+        self.include_user = include_user
+
+        # Number of queries that were given the response of another query
+        self.shared = 0
+
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, client, params: dict):
+        """returns the key identifying a query, given the parameters sent to the bot"""
+        return (client.base_url, params['query'], params.get('lang'), params.get('location'),
+                params['userId'] if self.include_user else None)
+
+    def do(self, key, function, *args, timeout=None):
+        """Call function(*args), unless a call with the same key is already in
+           flight, in which case its result is waited for, at most timeout
+           seconds (or (connect, read) pair) before raising a TimeoutError.
+           Returns a pair (result, shared), where shared is True if the result
+           is the one of another call. Exceptions are raised to all the callers.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            wait_timeout = get_wait_timeout(timeout)
+            if not call.event.wait(wait_timeout):
+                raise TimeoutError("No response to the identical query in flight within %ss" % wait_timeout)
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    async def do_async(self, key, function, *args, timeout=None):
+        """The asyncio version of do: function(*args) is a coroutine, and
+           asyncio.TimeoutError is raised when the timeout expires.
+
+           The call runs in its own task, so that it is not cancelled with
+           the caller that started it, as long as others wait for it. It is
+           cancelled when the last caller is cancelled or times out.
+        """
+        key = (id(asyncio.get_event_loop()), key)
+
+        with self._lock:
+            # [task, number of callers waiting for it]
+            entry = self._tasks.get(key)
+            if entry is not None:
+                self.shared += 1
+                entry[1] += 1
+                leader = False
+            else:
+                task = asyncio.ensure_future(function(*args))
+                entry = self._tasks[key] = [task, 1]
+                task.add_done_callback(lambda _: self._forget(key, entry))
+                leader = True
+
+        task = entry[0]
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), get_wait_timeout(timeout))
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                abandoned = entry[1] == 0 and not task.done()
+            if abandoned:
+                task.cancel()
+        return result, not leader
+
+    def _forget(self, key, entry):
+        with self._lock:
+            if self._tasks.get(key) is entry:
+                del self._tasks[key]
@@ -0,0 +1,149 @@
+"""Strategies of a client group.
+
+By default, a client group waits for the answers of all its bots. A strategy
+lets the group stop as soon as it has the answers it needs, and abandon the
+queries still running:
+
+    from openchatbotclient.strategy import FirstSuccess
+
+    responses = bots.ask("amedee", "hello", strategy=FirstSuccess())
+    response = responses.get_first()
+
+The available strategies are:
+    - FirstSuccess: the first bot to answer wins
+    - FirstSuccesses: the first n bots to answer win
+    - Priority: the first bot of the group that answers wins, which is
+      known as soon as all the bots placed before it failed
+    - BestScore: the answer with the best score wins, among the ones
+      received before a deadline, or as soon as one is good enough
+
+A strategy is given the results received so far, in the order they were
+received. Each result is either a Response or an ErrorRecord.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: BestScore is given a Scorer and a threshold, see the ranking module
+"""
+
+from .ranking import KeyScore, SCORER_DEFAULT, get_best
+from .response import ErrorRecord
+
+
+def _successes(results):
+    return [result for result in results if not isinstance(result, ErrorRecord)]
+
+
+class Strategy:
+    """Waits for all the bots, and keeps all their answers"""
+
+    # Maximum time in seconds for the whole group, if no other is given to ask
+    deadline = None
+
+    def is_complete(self, clients, results) -> bool:
+        """returns True when no more answers are needed"""
+        return False
+
+    def select(self, clients, results) -> list:
+        """returns the Responses to keep, out of the results"""
+        return _successes(results)
+
+
+class FirstSuccess(Strategy):
+    """Keeps the first answer received"""
+
+    def __init__(self, deadline: float = None):
+        self.deadline = deadline
+
+    def is_complete(self, clients, results) -> bool:
+        return any(not isinstance(result, ErrorRecord) for result in results)
+
+    def select(self, clients, results) -> list:
+        return _successes(results)[:1]
+
+
+class FirstSuccesses(Strategy):
+    """Keeps the first n answers received"""
+
+    def __init__(self, n: int, deadline: float = None):
+        assert n > 0
+        self.n = n
+        self.deadline = deadline
+
+    def is_complete(self, clients, results) -> bool:
+        return len(_successes(results)) >= self.n
+
+    def select(self, clients, results) -> list:
+        return _successes(results)[:self.n]
+
+
+class Priority(Strategy):
+    """Keeps the answer of the first bot of the group that did not fail.
+       The group stops as soon as this bot answers and all the bots before
+       it have failed, without waiting for the bots after it.
+    """
+
+    def __init__(self, deadline: float = None):
+        self.deadline = deadline
+
+    def is_complete(self, clients, results) -> bool:
+        return self._get_best(clients, results) is not None
+
+    def select(self, clients, results) -> list:
+        # Once complete, this is the answer of the first bot that did not fail.
+        # Otherwise (deadline expired) this is the best answer received.
+        successes = _successes(results)
+        for client in clients:
+            for response in successes:
+                if response.client is client:
+                    return [response]
+        return []
+
+    @staticmethod
+    def _get_best(clients, results):
+        for client in clients:
+            for result in results:
+                if result.client is client:
+                    break
+            else:
+                # This bot did not answer yet
+                return None
+            if not isinstance(result, ErrorRecord):
+                return result
+        return None
+
+
+class BestScore(Strategy):
+    """Keeps the answer having the highest score, among the answers received
+       before the deadline. The score is given by a Scorer (see the ranking
+       module) or by the key function, and defaults to the score returned by
+       the bot. With a threshold, the group stops as soon as an answer has at
+       least this score.
+    """
+
+    def __init__(self, deadline: float = None, key=None, scorer=None, threshold: float = None):
+        self.deadline = deadline
+        self.scorer = scorer or (KeyScore(key) if key else SCORER_DEFAULT)
+        self.threshold = threshold
+
+    def is_complete(self, clients, results) -> bool:
+        if self.threshold is None:
+            return False
+        successes = _successes(results)
+        positions = _get_positions(clients, successes)
+        return any(self.scorer.score(response, position) >= self.threshold
+                   for response, position in zip(successes, positions))
+
+    def select(self, clients, results) -> list:
+        successes = _successes(results)
+        if not successes:
+            return []
+        return [get_best(successes, self.scorer, _get_positions(clients, successes))]
+
+
+def _get_positions(clients, responses) -> list:
+    """returns the index in the group of the client of each response"""
+    indexes = {id(client): index for index, client in enumerate(clients)}
+    return [indexes.get(id(response.client), len(indexes)) for response in responses]
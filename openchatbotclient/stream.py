@@ -0,0 +1,436 @@
+"""Streaming of the responses of the bots.
+
+The ask method of the clients returns once the whole response is received
+and decoded. With ask_stream, the body of the response is read incrementally,
+so that its text and status are available as soon as they are received,
+before the bulky parts of the response (medias, context...):
+
+    with client.ask_stream("my-userId", "hello") as stream:
+        print(stream.get_text())          # As soon as the text is received
+        response = stream.get_response()  # Once the whole body is received
+
+Bots may also send partial answers, as Server-Sent Events (text/event-stream)
+or as one JSON document per line (application/x-ndjson). They are then
+available as they arrive, and the final answer is the last one:
+
+    with client.ask_stream("my-userId", "tell me a story") as stream:
+        for partial in stream.partials():
+            print(partial)
+
+The AsyncClient has the same ask_stream method, where the methods of the
+stream are coroutines and partials() an asynchronous iterator.
+
+Streamed queries are sent directly to the bot: they do not use the response
+cache, single-flight, hedging nor hooks of the client.
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version
+    - 2026/10/18: The chunks of the requests transport are read as they are received
+"""
+
+import re
+import time
+
+from collections import deque
+
+from . import codec
+
+# Maximum size of the chunks read from the body of the responses
+CHUNK_SIZE = 8192
+
+# The fields of the response available before the end of the body
+STATUS_PATH = ('status',)
+TEXT_PATH = ('response', 'text')
+
+# The content types accepted for the responses, in order of preference
+ACCEPT = 'text/event-stream, application/x-ndjson, application/json'
+
+_STRUCTURE = re.compile(rb'["{}\[\],:]')
+
+
+class _Frame:
+    """An object or array being scanned"""
+
+    __slots__ = ('is_object', 'path', 'key', 'expects_key', 'capture')
+
+    def __init__(self, is_object: bool, path):
+        self.is_object = is_object
+        # The path of the container, or None if none of its values are wanted
+        self.path = path
+        self.key = None
+        self.expects_key = is_object
+        # The start of the wanted value being read, if any
+        self.capture = None
+
+
+class JsonScanner:
+    """Extracts some values from a JSON document, as soon as they are received.
+
+       The document is given by chunks to the feed method. Each byte is scanned
+       once, even when a chunk ends in the middle of a string. Only the wanted
+       values are decoded: the rest of the document is skipped.
+
+           scanner = JsonScanner([('status',), ('response', 'text')])
+           scanner.feed(b'{"status": {"code": 200}, "resp')
+           scanner.values   # {('status',): {'code': 200}}
+    """
+
+    def __init__(self, paths):
+        """The constructor parameters are:
+           - paths: the paths of the wanted values, each one a tuple of keys
+        """
+        self.paths = set(tuple(path) for path in paths)
+        self.prefixes = set(path[:i] for path in self.paths for i in range(len(path)))
+
+        # The decoded values found, by path
+        self.values = {}
+
+        self._buffer = bytearray()
+        self._position = 0
+        self._stack = []
+        # The start of the string being read, and where to look for its end
+        self._string = None
+        self._string_from = 0
+        self._started = False
+
+    @property
+    def complete(self) -> bool:
+        """True when all the values were found, or the document ended"""
+        return len(self.values) == len(self.paths) or (self._started and not self._stack)
+
+    def feed(self, chunk: bytes):
+        if self.complete:
+            return
+        self._buffer += chunk
+        self._scan()
+
+    def _scan(self):
+        buffer = self._buffer
+        stack = self._stack
+
+        while not self.complete:
+            if self._string is not None:
+                if not self._read_string():
+                    return
+                continue
+
+            match = _STRUCTURE.search(buffer, self._position)
+            if match is None:
+                self._position = len(buffer)
+                return
+            position = match.start()
+            char = buffer[position]
+            self._position = position + 1
+            frame = stack[-1] if stack else None
+            if frame is None and char not in (0x22, 0x7b, 0x5b):
+                # Not a JSON document
+                continue
+
+            if char == 0x22:    # "
+                self._string = position
+                self._string_from = position + 1
+
+            elif char == 0x3a:  # :
+                frame.expects_key = False
+                if frame.path is not None and frame.path + (frame.key,) in self.paths:
+                    frame.capture = position + 1
+
+            elif char == 0x2c:  # ,
+                self._end_value(frame, position)
+                frame.expects_key = frame.is_object
+
+            elif char in (0x7b, 0x5b):  # { [
+                path = None
+                if frame is None:
+                    path = ()
+                elif frame.path is not None and frame.capture is None and char == 0x7b:
+                    child = frame.path + (frame.key,)
+                    if child in self.prefixes:
+                        path = child
+                stack.append(_Frame(char == 0x7b, path))
+                self._started = True
+
+            else:               # } ]
+                self._end_value(frame, position)
+                stack.pop()
+
+    def _read_string(self) -> bool:
+        """Look for the end of the string being read. Returns False if it
+           is not received yet
+        """
+        buffer = self._buffer
+        while True:
+            end = buffer.find(b'"', self._string_from)
+            if end < 0:
+                # Resume from the end of the buffer, keeping a trailing backslash
+                self._string_from = max(self._string_from, len(buffer) - 1)
+                return False
+            backslashes = 0
+            while buffer[end - 1 - backslashes] == 0x5c:
+                backslashes += 1
+            self._string_from = end + 1
+            if backslashes % 2 == 0:
+                break
+
+        start, self._string = self._string, None
+        self._position = end + 1
+
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame.expects_key and frame.path is not None:
+            frame.key = codec.loads(bytes(buffer[start:end + 1]))
+        return True
+
+    def _end_value(self, frame: _Frame, position: int):
+        if frame.capture is not None:
+            path = frame.path + (frame.key,)
+            self.values[path] = codec.loads(bytes(self._buffer[frame.capture:position]))
+            frame.capture = None
+
+
+class _Parser:
+    """Parses the body of a streamed response, given by chunks"""
+
+    def __init__(self, content_type: str):
+        content_type = content_type.split(';', 1)[0].strip().lower()
+        if content_type == 'text/event-stream':
+            self.mode = 'sse'
+        elif content_type in ('application/x-ndjson', 'application/jsonl'):
+            self.mode = 'ndjson'
+        else:
+            self.mode = 'json'
+
+        self.scanner = JsonScanner([STATUS_PATH, TEXT_PATH])
+
+        # The whole body of a JSON response, or the raw content of the last
+        # partial answer
+        self.raw = bytearray()
+        self._pending = bytearray()
+
+    def feed(self, chunk: bytes) -> list:
+        """returns the partial answers completed by the chunk"""
+        if self.mode == 'json':
+            self.raw += chunk
+            self.scanner.feed(chunk)
+            return []
+
+        self._pending += chunk
+        separator = b'\n\n' if self.mode == 'sse' else b'\n'
+        if self.mode == 'sse' and b'\r' in self._pending:
+            self._pending = bytearray(self._pending.replace(b'\r\n', b'\n'))
+
+        partials = []
+        while True:
+            end = self._pending.find(separator)
+            if end < 0:
+                return partials
+            item = bytes(self._pending[:end])
+            del self._pending[:end + len(separator)]
+            self._add_partial(item, partials)
+
+    def finish(self) -> list:
+        """returns the partial answer left at the end of the body, if any"""
+        partials = []
+        if self.mode != 'json' and self._pending.strip():
+            self._add_partial(bytes(self._pending), partials)
+            self._pending.clear()
+        return partials
+
+    def _add_partial(self, item: bytes, partials: list):
+        if self.mode == 'sse':
+            lines = [line[5:].lstrip(b' ') for line in item.split(b'\n') if line.startswith(b'data:')]
+            if not lines:
+                return
+            item = b'\n'.join(lines)
+        elif not item.strip():
+            return
+
+        try:
+            partial = codec.loads(item)
+        except ValueError:
+            partial = item.decode('utf-8', 'replace')
+
+        if isinstance(partial, dict):
+            self.raw = bytearray(item)
+            self._update_fields(partial)
+        partials.append(partial)
+
+    def _update_fields(self, partial: dict):
+        """Keep the first status and text of the partial answers"""
+        values = self.scanner.values
+        if STATUS_PATH not in values and isinstance(partial.get('status'), dict):
+            values[STATUS_PATH] = partial['status']
+        response = partial.get('response')
+        if TEXT_PATH not in values and isinstance(response, dict) and 'text' in response:
+            values[TEXT_PATH] = response['text']
+
+
+class _BaseStreamingResponse:
+
+    def __init__(self, client, r, start: float):
+        self.client = client
+        self.status_code = r.status_code
+        self._r = r
+        self._start = start
+        self._parser = _Parser(r.headers.get('Content-Type', ''))
+        self._partials = deque()
+        self._finished = False
+        self._response = None
+
+    def __str__(self):
+        return 'streaming_response(%s)' % self.client
+
+    @property
+    def mode(self) -> str:
+        """The format of the body: json, sse or ndjson"""
+        return self._parser.mode
+
+    def _add(self, chunk):
+        if chunk is None:
+            self._partials.extend(self._parser.finish())
+            self._finished = True
+        else:
+            self._partials.extend(self._parser.feed(chunk))
+
+    def _has(self, path) -> bool:
+        return path in self._parser.scanner.values or self._finished
+
+    def _get(self, path, default):
+        return self._parser.scanner.values.get(path, default)
+
+    def _get_response(self):
+        if self._response is None:
+            latency = time.perf_counter() - self._start
+            self._response = self.client._decode_response(bytes(self._parser.raw), latency)
+        return self._response
+
+
+def _iter_chunks(r):
+    """yields the chunks of the body of a response as soon as they are received.
+       The iter_content(CHUNK_SIZE) of requests would wait for CHUNK_SIZE bytes
+    """
+    read1 = getattr(getattr(r, 'raw', None), 'read1', None)
+    if read1 is None:
+        # A Http2Response, or urllib3 1.x: each chunk of a chunked body is
+        # yielded as it is received
+        yield from r.iter_content(None)
+        return
+    while True:
+        chunk = read1(CHUNK_SIZE, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+class StreamingResponse(_BaseStreamingResponse):
+    """The response of a bot, read incrementally. It should be closed, or used
+       as a context manager, so that its connection is released
+    """
+
+    def __init__(self, client, r, start: float):
+        super().__init__(client, r, start)
+        self._chunks = _iter_chunks(r)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._r.close()
+
+    def _read(self) -> bool:
+        """Read the next chunk of the body. Returns False at the end of the body"""
+        if not self._finished:
+            self._add(next(self._chunks, None))
+        return not self._finished
+
+    def get_status(self) -> dict:
+        """returns the status of the response, as soon as it is received"""
+        while not self._has(STATUS_PATH):
+            self._read()
+        return self._get(STATUS_PATH, {})
+
+    def get_text(self) -> str:
+        """returns the text of the response, as soon as it is received"""
+        while not self._has(TEXT_PATH):
+            self._read()
+        return self._get(TEXT_PATH, '')
+
+    def partials(self):
+        """returns an iterator of the partial answers, as they are received.
+           A response that is not streamed by the bot is a single answer.
+        """
+        while True:
+            while self._partials:
+                yield self._partials.popleft()
+            if not self._read():
+                if self._partials:
+                    continue
+                if self.mode == 'json':
+                    yield self.get_response().json
+                return
+
+    def get_response(self):
+        """returns the Response, once the whole body is received"""
+        while self._read():
+            pass
+        self.close()
+        return self._get_response()
+
+
+class AsyncStreamingResponse(_BaseStreamingResponse):
+    """The asyncio version of StreamingResponse"""
+
+    def __init__(self, client, r, start: float):
+        super().__init__(client, r, start)
+        # Without chunk size, httpx yields the data as soon as it is received
+        self._chunks = r.aiter_bytes()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._r.aclose()
+
+    async def _read(self) -> bool:
+        if not self._finished:
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            self._add(chunk)
+        return not self._finished
+
+    async def get_status(self) -> dict:
+        while not self._has(STATUS_PATH):
+            await self._read()
+        return self._get(STATUS_PATH, {})
+
+    async def get_text(self) -> str:
+        while not self._has(TEXT_PATH):
+            await self._read()
+        return self._get(TEXT_PATH, '')
+
+    async def partials(self):
+        while True:
+            while self._partials:
+                yield self._partials.popleft()
+            if not await self._read():
+                if self._partials:
+                    continue
+                if self.mode == 'json':
+                    yield (await self.get_response()).json
+                return
+
+    async def get_response(self):
+        while await self._read():
+            pass
+        await self.aclose()
+        return self._get_response()
@@ -0,0 +1,294 @@
+"""A local stub of an Open Chat Bot server.
+
+The stub speaks enough of the Alliance for Open Chatbot protocol to be used
+as a target for samples and benchmarks, without depending on any remote bot:
+    - GET /api/ask?userId=...&query=...
+    - POST /api/ask with a JSON body {'userId': ..., 'query': ...}
+    - GET /.well-known/openchatbot-configuration, describing the stub itself
+
+Example of usage:
+    from openchatbotclient.stub import StubServer
+    from openchatbotclient import Client
+
+    with StubServer() as server:
+        client = Client(server.host, server.port)
+        response = client.ask("john", "hello")
+
+The server runs in a background thread, and uses HTTP/1.1 so that clients
+may keep their connections alive between two queries. Its latency, jitter,
+error rate and payload size may be configured.
+
+For benchmarks, the stub should rather run in its own process, so that it
+does not compete with the clients for the GIL:
+
+    with StubProcess(latency=0.01, jitter=0.005) as server:
+        client = Client(server.host, server.port)
+
+or from the command line:
+    python -m openchatbotclient.stub --port 8000 --latency 0.01
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version, used by the transport benchmark.
+    - 2026/10/18: Adding the jitter, errors, payload size, the descriptor,
+                  and the StubProcess
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+from .descriptor import ENDPOINT_DEFAULT
+
+# The path of the descriptor, see the repository module
+DESCRIPTOR_PATH = "/.well-known/openchatbot-configuration"
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately: without this, a kept alive
+    # connection waits on the delayed ACK of the client for every answer.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # Keep the benchmark output clean
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == DESCRIPTOR_PATH:
+            self._send(200, self.server.get_descriptor())
+            return
+        if url.path != self.server.endpoint:
+            self._send(404, {'status': {'code': 404, 'status': 'error', 'errorType': 'Not found'}})
+            return
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self._answer(params)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if url.path != self.server.endpoint:
+            self._send(404, {'status': {'code': 404, 'status': 'error', 'errorType': 'Not found'}})
+            return
+        try:
+            params = json.loads(body)
+        except ValueError:
+            self._send(400, {'status': {'code': 400, 'status': 'error', 'errorType': 'Invalid JSON'}})
+            return
+        self._answer(params)
+
+    def _answer(self, params):
+        server = self.server
+        delay = server.get_delay()
+        if delay:
+            time.sleep(delay)
+
+        if server.error_rate and server.random.random() < server.error_rate:
+            self._send(500, {'status': {'code': 500, 'status': 'error', 'errorType': 'Stub error'}})
+            return
+
+        query = params.get('query', '')
+        self._send(200, {
+            'response': {
+                'query': query,
+                'userId': params.get('userId', ''),
+                'timestamp': time.time(),
+                'text': 'You said: %s' % query,
+                'tts': [],
+                'infoURL': '',
+                'medias': server.medias,
+                'context': [],
+                'suggestions': []
+            },
+            'meta': {
+                'version': '0.0.1',
+                'botIcon': '',
+                'botName': 'Stub',
+                'copyright': '',
+                'authors': []
+            },
+            'status': {
+                'code': 200,
+                'status': 'success'
+            }
+        })
+
+    def _send(self, code, data):
+        content = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    # Accept bursts of concurrent connections
+    request_queue_size = 1024
+
+    def __init__(self, port: int = 0, endpoint: str = ENDPOINT_DEFAULT, latency: float = 0,
+                 jitter: float = 0, error_rate: float = 0, payload_size: int = 0, seed=None):
+        """Create a stub server. The constructor parameters are:
+           - port: the port to listen on, on localhost. Default is any free port
+           - endpoint: the path of the ask API, defaults to /api/ask
+           - latency: optional, a number of seconds to wait before each answer
+           - jitter: optional, a random number of seconds, up to this one, added
+                     to the latency of each answer
+           - error_rate: optional, the ratio of queries, from 0 to 1, answered
+                         with an error 500
+           - payload_size: optional, the size in bytes of the medias added to each answer
+           - seed: optional, the seed of the random jitter and errors
+        """
+        super().__init__(('127.0.0.1', port), StubRequestHandler)
+        self.endpoint = endpoint
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.medias = [{'type': 'text', 'content': 'x' * payload_size}] if payload_size else []
+        self._thread = None
+
+    def get_delay(self) -> float:
+        """returns the time in seconds to wait before an answer"""
+        if self.jitter:
+            return self.latency + self.random.uniform(0, self.jitter)
+        return self.latency
+
+    def get_descriptor(self) -> dict:
+        return {
+            'openchatbot': {
+                'host': self.host,
+                'port': self.port,
+                'endpoint': self.endpoint,
+                'methods': ['GET', 'POST'],
+            }
+        }
+
+    @property
+    def host(self) -> str:
+        return 'http://127.0.0.1'
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return '%s:%d%s' % (self.host, self.port, self.endpoint)
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a query (deadline, cancellation) are expected
+        pass
+
+    def start(self):
+        """Serve the requests in a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket"""
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class StubProcess:
+    """A stub server running in a child process. The constructor parameters
+       are the same as for StubServer.
+    """
+
+    def __init__(self, port: int = 0, endpoint: str = ENDPOINT_DEFAULT, latency: float = 0,
+                 jitter: float = 0, error_rate: float = 0, payload_size: int = 0, seed=None):
+        self.endpoint = endpoint
+        self._arguments = ['--port', str(port), '--endpoint', endpoint, '--latency', str(latency),
+                           '--jitter', str(jitter), '--error-rate', str(error_rate),
+                           '--payload-size', str(payload_size)]
+        if seed is not None:
+            self._arguments += ['--seed', str(seed)]
+        self._process = None
+        self.port = None
+
+    @property
+    def host(self) -> str:
+        return 'http://127.0.0.1'
+
+    @property
+    def url(self) -> str:
+        return '%s:%d%s' % (self.host, self.port, self.endpoint)
+
+    def start(self):
+        """Start the process, and wait until it serves the requests"""
+        self._process = subprocess.Popen([sys.executable, '-m', 'openchatbotclient.stub'] + self._arguments,
+                                         stdout=subprocess.PIPE, universal_newlines=True)
+        # The first line written by the process is its URL
+        line = self._process.stdout.readline()
+        if not line:
+            self._process.wait()
+            raise RuntimeError("The stub process failed to start")
+        self.port = int(urlsplit(line.strip()).port)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m openchatbotclient.stub',
+                                     description='Run a stub Open Chat Bot server')
+    parser.add_argument('--port', type=int, default=0, help='the port to listen on, default is any free port')
+    parser.add_argument('--endpoint', default=ENDPOINT_DEFAULT, help='the path of the ask API')
+    parser.add_argument('--latency', type=float, default=0, help='the latency of the answers, in seconds')
+    parser.add_argument('--jitter', type=float, default=0, help='the random latency added, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='the ratio of errors, from 0 to 1')
+    parser.add_argument('--payload-size', type=int, default=0, help='the size of the medias, in bytes')
+    parser.add_argument('--seed', type=int, default=None, help='the seed of the jitter and errors')
+    options = parser.parse_args(arguments)
+
+    server = StubServer(port=options.port, endpoint=options.endpoint, latency=options.latency,
+                        jitter=options.jitter, error_rate=options.error_rate,
+                        payload_size=options.payload_size, seed=options.seed)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
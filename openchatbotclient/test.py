@@ -1,11 +1,17 @@
 """
 Various sample usages of the Alliance for Open Chatbot client utilities
 
+These samples query live public bots. To run the client against local stub
+servers, and measure its performance, see the bench package:
+
+    python -m openchatbotclient.bench.suite --quick
+
 Authors:
     - Amédée Potier (amedee.potier@konverso.ai) from Konverso
 
 History:
     - 2020/11/02: Amédée: Initial version.
+    - 2026/10/18: Pointing to the benchmark suite for the local runs
 
 """
 
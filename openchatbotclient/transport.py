@@ -0,0 +1,453 @@
+"""Transport for Open Chat Bot clients.
+
+A transport owns the HTTP connections used to send queries to the bots.
+Connections are pooled and kept alive, so that a conversation only pays
+the TCP and TLS handshakes once per host, and not once per message.
+
+Each client creates its own transport by default. A transport may
+also be shared by several clients:
+
+    from openchatbotclient import Client, Transport
+
+    with Transport(pool_maxsize=20) as transport:
+        bot1 = Client('https://bot1.domain.com', transport=transport)
+        bot2 = Client('https://bot2.domain.com', transport=transport)
+        response = bot1.ask("my-userId", "hello")
+
+The AsyncTransport is the asyncio equivalent, used by the AsyncClient. It
+requires the optional httpx package. Unless told otherwise, all the async
+clients of an event loop share the same AsyncTransport:
+
+    transport = AsyncTransport.shared()
+
+The Http2Transport multiplexes the concurrent queries to each host over a
+single HTTP/2 connection, instead of one HTTP/1.1 connection per query in
+flight. It requires the optional httpx and h2 packages. The protocol is
+negotiated with each server: the servers that only speak HTTP/1.1 are
+queried with pooled HTTP/1.1 connections, as with the Transport. The
+AsyncTransport speaks HTTP/2 as well when given http2=True:
+
+    bot = Client('https://bot.domain.com', transport=Http2Transport())
+
+Authors:
+    - Konverso
+
+History:
+    - 2026/10/18: Initial version, pooled keep-alive sessions.
+    - 2026/10/18: Adding the AsyncTransport
+    - 2026/10/18: Timing of the new connections and TLS handshakes
+    - 2026/10/18: Adding AsyncTransport.stream
+    - 2026/10/18: requests is only imported by the first request, see the adapter module
+    - 2026/10/18: Adding the Http2Transport, and HTTP/2 in the AsyncTransport
+    - 2026/10/18: The time to first byte is part of the timings
+"""
+
+import threading
+import time
+import weakref
+
+# Number of hosts for which a pool of connections is kept
+POOL_CONNECTIONS_DEFAULT = 10
+
+# Number of connections kept alive for each host
+POOL_MAXSIZE_DEFAULT = 10
+
+# Only failures to connect are retried, as the query was then never
+# received by the bot.
+RETRIES_DEFAULT = 2
+BACKOFF_FACTOR_DEFAULT = 0.1
+
+# Limits of the asynchronous and HTTP/2 connection pools, for all hosts
+MAX_CONNECTIONS_DEFAULT = 1000
+MAX_KEEPALIVE_CONNECTIONS_DEFAULT = 100
+
+_HTTP2_REQUIRED = "HTTP/2 requires the httpx and h2 packages: pip install httpx[http2]"
+
+
+class Timings(threading.local):
+    """The time spent opening connections by the current request of a thread:
+       - connect: resolving the host and opening the TCP connections
+       - tls: the TLS handshakes
+       Both are 0 when a pooled connection is reused.
+       - ttfb: the time until the response headers were received, None if unknown
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.connect = 0
+        self.tls = 0
+        self.ttfb = None
+
+
+timings = Timings()
+
+
+class Transport:
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS_DEFAULT,
+                 pool_maxsize: int = POOL_MAXSIZE_DEFAULT,
+                 pool_block: bool = False,
+                 retries=RETRIES_DEFAULT,
+                 backoff_factor: float = BACKOFF_FACTOR_DEFAULT,
+                 verify: bool = False):
+        """Create a transport. The constructor parameters are:
+           - pool_connections: number of hosts for which connections are pooled
+           - pool_maxsize: number of connections kept alive per host
+           - pool_block: if True, wait for a free connection instead of opening
+                         a new (not pooled) one when the pool is exhausted
+           - retries: either a number of retries on connection errors, or a
+                      urllib3 Retry instance for complete control
+           - backoff_factor: the delay factor between two retries
+           - verify: whether the server TLS certificates are verified
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.verify = verify
+
+        # The requests session is created by the first request, so that
+        # importing and creating clients stays fast
+        self._session = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __str__(self):
+        return "transport(pool_maxsize=%d)" % self.pool_maxsize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def session(self):
+        """The requests.Session sending the requests"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    # Inner import, as requests is long to import
+                    from .adapter import create_session
+                    self._session = create_session(self.pool_connections, self.pool_maxsize, self.pool_block,
+                                                   self.retries, self.backoff_factor, self.verify)
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs):
+        """Send a request through the pooled session. Parameters are the
+           same as for requests.request. Returns a requests.Response
+
+           The time spent opening connections for this request is then
+           available in transport.timings.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+        timings.reset()
+        r = self.session.request(method, url, **kwargs)
+        # The time between sending the request and parsing the response headers
+        timings.ttfb = r.elapsed.total_seconds()
+        return r
+
+    @property
+    def timings(self) -> Timings:
+        """The connection timings of the last request of the current thread"""
+        return timings
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close all the pooled connections"""
+        if not self._closed:
+            self._closed = True
+            if self._session is not None:
+                self._session.close()
+
+
+class AsyncTransport:
+
+    # The shared transport of each event loop
+    _shared = weakref.WeakKeyDictionary()
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS_DEFAULT,
+                 max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS_DEFAULT,
+                 retries: int = RETRIES_DEFAULT,
+                 verify: bool = False,
+                 http2: bool = False):
+        """Create an asynchronous transport. The constructor parameters are:
+           - max_connections: the maximum number of concurrent connections, for all hosts.
+                              Further requests wait for a connection to be released
+           - max_keepalive_connections: the number of idle connections kept alive
+           - retries: the number of retries on connection errors
+           - verify: whether the server TLS certificates are verified
+           - http2: if True, HTTP/2 is used with the servers supporting it. This
+                    requires the h2 package
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("The AsyncTransport requires the httpx package: pip install httpx")
+
+        self.max_connections = max_connections
+        self.http2 = http2
+
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections)
+
+        try:
+            transport = httpx.AsyncHTTPTransport(verify=verify, limits=limits, retries=retries, http2=http2)
+        except ImportError:
+            raise ImportError(_HTTP2_REQUIRED)
+
+        # As with requests, there is no timeout unless one is given for the request
+        self.client = httpx.AsyncClient(transport=transport, timeout=None)
+
+        self._closed = False
+
+    def __str__(self):
+        return "async_transport(max_connections=%d%s)" % (self.max_connections, ", http2" if self.http2 else "")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @classmethod
+    def shared(cls):
+        """Returns the transport shared by all the async clients of the running
+           event loop, creating it if needed
+        """
+        import asyncio
+        loop = asyncio.get_event_loop()
+        transport = cls._shared.get(loop)
+        if transport is None or transport.closed:
+            transport = cls._shared[loop] = cls()
+        return transport
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def request(self, method: str, url: str, data=None, timings: Timings = None, **kwargs):
+        """Send a request through the pooled connections. Parameters are the
+           same as for requests.request. Returns a httpx.Response
+
+           If a Timings instance is given, it receives the time spent opening
+           connections for this request.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+        client = self.client
+        if timings is not None:
+            kwargs['extensions'] = {'trace': _get_tracer(timings)}
+        return await client.request(method, url, content=data, **kwargs)
+
+    async def stream(self, method: str, url: str, data=None, **kwargs):
+        """Send a request, and returns its httpx.Response as soon as its headers
+           are received. Its body is read with aiter_bytes, and the response
+           must be closed with aclose.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+        request = self.client.build_request(method, url, content=data, **kwargs)
+        return await self.client.send(request, stream=True)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        """Close all the pooled connections"""
+        if not self._closed:
+            self._closed = True
+            await self.client.aclose()
+
+
+class Http2Transport:
+    def __init__(self, max_connections: int = MAX_CONNECTIONS_DEFAULT,
+                 max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS_DEFAULT,
+                 retries: int = RETRIES_DEFAULT,
+                 verify: bool = False):
+        """Create a transport multiplexing the queries over HTTP/2 connections.
+           The constructor parameters are:
+           - max_connections: the maximum number of concurrent connections, for all
+                              hosts. Each HTTP/2 connection carries many queries
+           - max_keepalive_connections: the number of idle connections kept alive
+           - retries: the number of retries on connection errors
+           - verify: whether the server TLS certificates are verified
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.retries = retries
+        self.verify = verify
+
+        # The httpx client is created by the first request, as for the Transport
+        self._client = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __str__(self):
+        return "http2_transport(max_connections=%d)" % self.max_connections
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def client(self):
+        """The httpx.Client sending the requests"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        try:
+            import httpx
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections)
+            transport = httpx.HTTPTransport(verify=self.verify, limits=limits, retries=self.retries, http2=True)
+        except ImportError:
+            raise ImportError(_HTTP2_REQUIRED)
+        return httpx.Client(transport=transport, timeout=None)
+
+    def request(self, method: str, url: str, params=None, data=None, headers=None, timeout=None,
+                stream: bool = False, **kwargs):
+        """Send a request. The parameters are the same as for the Transport, and
+           the response has the attributes of a requests.Response used by the
+           clients (status_code, headers, content, elapsed, iter_content, close...)
+
+           The time spent opening connections for this request is then
+           available in transport.timings.
+        """
+        if self._closed:
+            raise RuntimeError("Transport is closed")
+        if isinstance(timeout, tuple):
+            # The (connect, read) timeouts of requests
+            import httpx
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        if isinstance(data, (bytes, str)):
+            kwargs['content'] = data
+        elif data is not None:
+            kwargs['data'] = data
+        client = self.client
+        timings.reset()
+        kwargs['extensions'] = {'trace': _get_tracer(timings, asynchronous=False)}
+        request = client.build_request(method, url, params=params, headers=headers, timeout=timeout, **kwargs)
+        return Http2Response(client.send(request, stream=stream))
+
+    @property
+    def timings(self) -> Timings:
+        """The connection timings of the last request of the current thread"""
+        return timings
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close all the connections"""
+        if not self._closed:
+            self._closed = True
+            if self._client is not None:
+                self._client.close()
+
+
+class Http2Response:
+    """A httpx.Response, with the methods of a requests.Response used by the clients"""
+
+    __slots__ = ('response',)
+
+    def __init__(self, response):
+        self.response = response
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def iter_content(self, chunk_size: int = None):
+        # The chunks are yielded as they are received: httpx would
+        # otherwise wait for chunk_size bytes
+        return self.response.iter_bytes()
+
+    def close(self):
+        self.response.close()
+
+
+def _get_tracer(timings: Timings, asynchronous: bool = True):
+    """returns a httpx trace extension, recording the connection timings, and
+       the time until the response headers were received (http11 or http2)
+    """
+    begin = time.perf_counter()
+    started = {}
+
+    def record(event: str):
+        name, _, step = event.rpartition('.')
+        if step == 'started':
+            started[name] = time.perf_counter()
+        elif step in ('complete', 'failed') and name in started:
+            now = time.perf_counter()
+            duration = now - started.pop(name)
+            if name == 'connection.connect_tcp':
+                timings.connect += duration
+            elif name == 'connection.start_tls':
+                timings.tls += duration
+            elif step == 'complete' and name.endswith('.receive_response_headers'):
+                timings.ttfb = now - begin
+
+    if not asynchronous:
+        return lambda event, info: record(event)
+
+    async def trace(event: str, info: dict):
+        record(event)
+
+    return trace
+
+
+#
+# Sample code, comparing the latency of per-call requests with the pooled
+# transport, against a local stub server.
+#
+if __name__ == '__main__':
+    import requests
+
+    from openchatbotclient.client import Client
+    from openchatbotclient.stub import StubServer
+
+    count = 500
+
+    with StubServer() as server:
+
+        start = time.perf_counter()
+        for i in range(count):
+            requests.get(server.url, params={'userId': 'john', 'query': 'hello'})
+        unpooled = time.perf_counter() - start
+
+        with Client(server.host, server.port) as client:
+            start = time.perf_counter()
+            for i in range(count):
+                client.ask("john", "hello")
+            pooled = time.perf_counter() - start
+
+    print("Per-call requests: %.3f ms per query" % (unpooled * 1000 / count))
+    print("Pooled transport:  %.3f ms per query" % (pooled * 1000 / count))
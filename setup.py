@@ -18,5 +18,14 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
+    install_requires=[
+        "requests",
+    ],
+    extras_require={
+        "async": ["httpx"],
+        "fast": ["orjson"],
+        "analytics": ["numpy"],
+        "http2": ["httpx[http2]"],
+    },
 )